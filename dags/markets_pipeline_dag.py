@@ -5,10 +5,15 @@ Orchestrates ETL for stocks, crypto, and forex data
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
+import asyncio
+import glob
 import sys
 import os
 import yaml
 import logging
+import pyarrow as pa
+import orjson
+from typing import Optional
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
@@ -20,11 +25,28 @@ from transformers.stocks_transformer import StocksTransformer
 from transformers.crypto_transformer import CryptoTransformer
 from transformers.forex_transformer import ForexTransformer
 from loaders.data_loader import DataLoader
+from tools.cache import FileCache
 
 # Load configuration
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
-with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
+
+# libyaml-backed loader when PyYAML was built with it
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_config() -> dict:
+    """Parse config.yaml"""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+config = load_config()
+
+# Config-derived constants, resolved once at parse time
+STOCK_SYMBOLS = tuple(config['data_sources']['stocks']['symbols'])
+CRYPTO_IDS = tuple(coin['id'] for coin in config['data_sources']['crypto']['coins'])
+FOREX_BASE = config['data_sources']['forex']['base_currency']
+FOREX_TARGETS = tuple(config['data_sources']['forex']['target_currencies'])
 
 # Get API key from environment
 ALPHA_VANTAGE_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', 'demo')
@@ -33,6 +55,47 @@ ALPHA_VANTAGE_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', 'demo')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Raw API payloads (JSON) and transformed DataFrames (Arrow IPC) are handed
+# between tasks as files; only the file path travels through XCom
+STAGING_DIR = config['pipeline']['staging_dir']
+
+
+def _staging_path(context, filename: str) -> str:
+    """Build a staging file path for the current DAG run"""
+    os.makedirs(STAGING_DIR, exist_ok=True)
+    return os.path.join(STAGING_DIR, f"{context['run_id']}_{filename}")
+
+
+def _stage_raw(data, context, kind: str) -> Optional[str]:
+    """Write a raw API payload to a JSON file and return its path"""
+    if not data:
+        return None
+        
+    path = _staging_path(context, f"{kind}_raw.json")
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data))
+        
+    return path
+
+
+def _read_raw(path: str):
+    """Read a raw API payload staged by _stage_raw"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _stage_dataframe(df, context, kind: str) -> str:
+    """Write a DataFrame to an Arrow IPC file and return its path"""
+    path = _staging_path(context, f"{kind}.arrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+            
+    return path
+
+
 # Default arguments
 default_args = {
     'owner': 'gabriele_pascaretta',
@@ -55,61 +118,77 @@ dag = DAG(
 )
 
 
-def extract_stocks(**context):
-    """Extract stock market data"""
+def fetch_stocks():
+    """Fetch stock market data"""
     logger.info("Starting stock data extraction")
     
-    extractor = StocksExtractor(ALPHA_VANTAGE_KEY)
-    symbols = config['data_sources']['stocks']['symbols']
-    
-    data = extractor.extract_multiple_stocks(symbols)
+    cache = FileCache(config['cache']['dir'], ttl=config['cache']['ttl'])
+    extractor = StocksExtractor(ALPHA_VANTAGE_KEY, cache=cache)
+    # Bulk, then batch, then throttled per-symbol calls, as the key allows
+    data = extractor.extract_multiple_stocks(STOCK_SYMBOLS)
     
-    context['ti'].xcom_push(key='stocks_raw_data', value=data)
     logger.info(f"Extracted data for {len(data)} stocks")
+    return data
 
 
-def extract_crypto(**context):
-    """Extract cryptocurrency data"""
+def fetch_crypto():
+    """Fetch cryptocurrency data"""
     logger.info("Starting crypto data extraction")
     
     extractor = CryptoExtractor()
-    coin_ids = [coin['id'] for coin in config['data_sources']['crypto']['coins']]
-    
-    data = extractor.extract_crypto_details(coin_ids)
-    
-    context['ti'].xcom_push(key='crypto_raw_data', value=data)
+    data = extractor.extract_crypto_details(CRYPTO_IDS)
     
     logger.info(f"Extracted data for {len(data) if data else 0} cryptocurrencies")
+    return data
 
 
-def extract_forex(**context):
-    """Extract forex exchange rates"""
+def fetch_forex():
+    """Fetch forex exchange rates"""
     logger.info("Starting forex data extraction")
     
     extractor = ForexExtractor()
-    base_currency = config['data_sources']['forex']['base_currency']
-    target_currencies = config['data_sources']['forex']['target_currencies']
-    
-    data = extractor.extract_exchange_rates(base_currency, target_currencies)
+    data = extractor.extract_exchange_rates(FOREX_BASE, FOREX_TARGETS)
     
-    context['ti'].xcom_push(key='forex_raw_data', value=data)
     logger.info(f"Extracted forex rates")
+    return data
+
+
+async def gather_all():
+    """Run the three blocking extractors concurrently in worker threads"""
+    return await asyncio.gather(
+        asyncio.to_thread(fetch_stocks),
+        asyncio.to_thread(fetch_crypto),
+        asyncio.to_thread(fetch_forex),
+    )
+
+
+def extract_all(**context):
+    """Extract stocks, crypto and forex data concurrently within one task"""
+    stocks_data, crypto_data, forex_data = asyncio.run(gather_all())
+    
+    context['ti'].xcom_push(key='stocks_raw_path', value=_stage_raw(stocks_data, context, 'stocks'))
+    context['ti'].xcom_push(key='crypto_raw_path', value=_stage_raw(crypto_data, context, 'crypto'))
+    context['ti'].xcom_push(key='forex_raw_path', value=_stage_raw(forex_data, context, 'forex'))
 
 
 def transform_stocks(**context):
     """Transform stock data"""
     logger.info("Starting stock data transformation")
     
-    raw_data = context['ti'].xcom_pull(key='stocks_raw_data', task_ids='extract_stocks')
+    raw_path = context['ti'].xcom_pull(key='stocks_raw_path', task_ids='extract_all')
     
-    if not raw_data:
+    if not raw_path:
         logger.warning("No stock data to transform")
         return
     
+    raw_data = _read_raw(raw_path)
+    
     transformer = StocksTransformer()
     df = transformer.transform(raw_data)
     
-    context['ti'].xcom_push(key='stocks_transformed_data', value=df.to_dict('records'))
+    path = _stage_dataframe(df, context, 'stocks')
+    
+    context['ti'].xcom_push(key='stocks_transformed_path', value=path)
     logger.info(f"Transformed {len(df)} stock records")
 
 
@@ -117,16 +196,20 @@ def transform_crypto(**context):
     """Transform crypto data"""
     logger.info("Starting crypto data transformation")
     
-    raw_data = context['ti'].xcom_pull(key='crypto_raw_data', task_ids='extract_crypto')
+    raw_path = context['ti'].xcom_pull(key='crypto_raw_path', task_ids='extract_all')
     
-    if not raw_data:
+    if not raw_path:
         logger.warning("No crypto data to transform")
         return
     
+    raw_data = _read_raw(raw_path)
+    
     transformer = CryptoTransformer()
     df = transformer.transform(raw_data)
     
-    context['ti'].xcom_push(key='crypto_transformed_data', value=df.to_dict('records'))
+    path = _stage_dataframe(df, context, 'crypto')
+    
+    context['ti'].xcom_push(key='crypto_transformed_path', value=path)
     logger.info(f"Transformed {len(df)} crypto records")
 
 
@@ -134,16 +217,20 @@ def transform_forex(**context):
     """Transform forex data"""
     logger.info("Starting forex data transformation")
     
-    raw_data = context['ti'].xcom_pull(key='forex_raw_data', task_ids='extract_forex')
+    raw_path = context['ti'].xcom_pull(key='forex_raw_path', task_ids='extract_all')
     
-    if not raw_data:
+    if not raw_path:
         logger.warning("No forex data to transform")
         return
     
+    raw_data = _read_raw(raw_path)
+    
     transformer = ForexTransformer()
     df = transformer.transform(raw_data)
     
-    context['ti'].xcom_push(key='forex_transformed_data', value=df.to_dict('records'))
+    path = _stage_dataframe(df, context, 'forex')
+    
+    context['ti'].xcom_push(key='forex_transformed_path', value=path)
     logger.info(f"Transformed {len(df)} forex records")
 
 
@@ -151,15 +238,13 @@ def load_stocks(**context):
     """Load stock data to database"""
     logger.info("Starting stock data loading")
     
-    import pandas as pd
-    
-    data = context['ti'].xcom_pull(key='stocks_transformed_data', task_ids='transform_stocks')
+    path = context['ti'].xcom_pull(key='stocks_transformed_path', task_ids='transform_stocks')
     
-    if not data:
+    if not path:
         logger.warning("No stock data to load")
         return
     
-    df = pd.DataFrame(data)
+    df = pa.ipc.open_file(pa.memory_map(path)).read_pandas()
     
     db_path = config['database']['path']
     loader = DataLoader(db_path)
@@ -172,15 +257,13 @@ def load_crypto(**context):
     """Load crypto data to database"""
     logger.info("Starting crypto data loading")
     
-    import pandas as pd
-    
-    data = context['ti'].xcom_pull(key='crypto_transformed_data', task_ids='transform_crypto')
+    path = context['ti'].xcom_pull(key='crypto_transformed_path', task_ids='transform_crypto')
     
-    if not data:
+    if not path:
         logger.warning("No crypto data to load")
         return
     
-    df = pd.DataFrame(data)
+    df = pa.ipc.open_file(pa.memory_map(path)).read_pandas()
     
     db_path = config['database']['path']
     loader = DataLoader(db_path)
@@ -193,15 +276,13 @@ def load_forex(**context):
     """Load forex data to database"""
     logger.info("Starting forex data loading")
     
-    import pandas as pd
+    path = context['ti'].xcom_pull(key='forex_transformed_path', task_ids='transform_forex')
     
-    data = context['ti'].xcom_pull(key='forex_transformed_data', task_ids='transform_forex')
-    
-    if not data:
+    if not path:
         logger.warning("No forex data to load")
         return
     
-    df = pd.DataFrame(data)
+    df = pa.ipc.open_file(pa.memory_map(path)).read_pandas()
     
     db_path = config['database']['path']
     loader = DataLoader(db_path)
@@ -210,22 +291,21 @@ def load_forex(**context):
     logger.info(f"Loaded {count} forex records to database")
 
 
-# Define tasks
-extract_stocks_task = PythonOperator(
-    task_id='extract_stocks',
-    python_callable=extract_stocks,
-    dag=dag,
-)
+def cleanup_staging(**context):
+    """Remove the staging files written by this DAG run"""
+    pattern = os.path.join(glob.escape(STAGING_DIR), f"{glob.escape(context['run_id'])}_*")
+    
+    for path in glob.glob(pattern):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove staging file {path}: {e}")
 
-extract_crypto_task = PythonOperator(
-    task_id='extract_crypto',
-    python_callable=extract_crypto,
-    dag=dag,
-)
 
-extract_forex_task = PythonOperator(
-    task_id='extract_forex',
-    python_callable=extract_forex,
+# Define tasks
+extract_all_task = PythonOperator(
+    task_id='extract_all',
+    python_callable=extract_all,
     dag=dag,
 )
 
@@ -265,7 +345,17 @@ load_forex_task = PythonOperator(
     dag=dag,
 )
 
-# Set task dependencies - parallel extraction and processing
-extract_stocks_task >> transform_stocks_task >> load_stocks_task
-extract_crypto_task >> transform_crypto_task >> load_crypto_task
-extract_forex_task >> transform_forex_task >> load_forex_task
+# Runs once every load has finished, failed or not, so files never pile up
+cleanup_staging_task = PythonOperator(
+    task_id='cleanup_staging',
+    python_callable=cleanup_staging,
+    trigger_rule='all_done',
+    dag=dag,
+)
+
+# Set task dependencies - concurrent extraction, parallel processing
+extract_all_task >> [transform_stocks_task, transform_crypto_task, transform_forex_task]
+transform_stocks_task >> load_stocks_task
+transform_crypto_task >> load_crypto_task
+transform_forex_task >> load_forex_task
+[load_stocks_task, load_crypto_task, load_forex_task] >> cleanup_staging_task
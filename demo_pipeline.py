@@ -16,7 +16,7 @@ Output:
 import sys
 import os
 import logging
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +29,7 @@ from extractors.forex_extractor import ForexExtractor
 from transformers.stocks_transformer import StocksTransformer
 from transformers.crypto_transformer import CryptoTransformer
 from transformers.forex_transformer import ForexTransformer
+from tools.cache import FileCache
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +46,31 @@ def ensure_data_directory():
     return data_dir
 
 
+def save_csv(df, output_file: Path, use_pyarrow: bool = True):
+    """
+    Write a DataFrame to CSV
+    
+    Uses pyarrow's C++ CSV writer when available, falling back to
+    DataFrame.to_csv otherwise.
+    
+    Args:
+        df: DataFrame to write
+        output_file: Destination CSV path
+        use_pyarrow: Prefer the pyarrow writer
+    """
+    if use_pyarrow:
+        try:
+            import pyarrow as pa
+            from pyarrow import csv as pacsv
+        except ImportError:
+            use_pyarrow = False
+            
+    if use_pyarrow:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), str(output_file))
+    else:
+        df.to_csv(output_file, index=False)
+
+
 def run_stocks_pipeline(api_key: str, data_dir: Path):
     """
     Run stocks extraction and transformation pipeline
@@ -62,7 +88,8 @@ def run_stocks_pipeline(api_key: str, data_dir: Path):
     
     # Extract
     logger.info(f"Extracting data for symbols: {symbols}")
-    extractor = StocksExtractor(api_key)
+    cache = FileCache(str(Path(__file__).parent / '.cache' / 'stocks'))
+    extractor = StocksExtractor(api_key, cache=cache)
     raw_data = extractor.extract_multiple_stocks(symbols, delay=12)
     
     if not raw_data:
@@ -72,18 +99,12 @@ def run_stocks_pipeline(api_key: str, data_dir: Path):
     # Transform
     logger.info("Transforming stock data...")
     transformer = StocksTransformer()
-    transformed_data = []
-    
-    for stock in raw_data:
-        transformed = transformer.transform(stock)
-        if transformed:
-            transformed_data.append(transformed)
+    df = transformer.transform(raw_data)
     
-    # Convert to DataFrame and save
-    if transformed_data:
-        df = pd.DataFrame(transformed_data)
+    # Save
+    if not df.empty:
         output_file = data_dir / 'stocks_output.csv'
-        df.to_csv(output_file, index=False)
+        save_csv(df, output_file)
         
         logger.info(f"\n{'='*60}")
         logger.info("STOCKS DATA SAMPLE:")
@@ -112,7 +133,7 @@ def run_crypto_pipeline(data_dir: Path):
     # Extract
     logger.info(f"Extracting data for: {crypto_ids}")
     extractor = CryptoExtractor()
-    raw_data = extractor.extract_multiple_cryptos(crypto_ids)
+    raw_data = extractor.extract_crypto_details(crypto_ids)
     
     if not raw_data:
         logger.warning("No crypto data extracted")
@@ -121,18 +142,12 @@ def run_crypto_pipeline(data_dir: Path):
     # Transform
     logger.info("Transforming crypto data...")
     transformer = CryptoTransformer()
-    transformed_data = []
-    
-    for crypto in raw_data:
-        transformed = transformer.transform(crypto)
-        if transformed:
-            transformed_data.append(transformed)
+    df = transformer.transform(raw_data)
     
-    # Convert to DataFrame and save
-    if transformed_data:
-        df = pd.DataFrame(transformed_data)
+    # Save
+    if not df.empty:
         output_file = data_dir / 'crypto_output.csv'
-        df.to_csv(output_file, index=False)
+        save_csv(df, output_file)
         
         logger.info(f"\n{'='*60}")
         logger.info("CRYPTO DATA SAMPLE:")
@@ -144,29 +159,25 @@ def run_crypto_pipeline(data_dir: Path):
         logger.warning("No transformed crypto data to save")
 
 
-def run_forex_pipeline(api_key: str, data_dir: Path):
+def run_forex_pipeline(data_dir: Path):
     """
     Run forex extraction and transformation pipeline
     
     Args:
-        api_key: Exchange Rate API key
         data_dir: Directory to save output
     """
     logger.info("=" * 60)
     logger.info("FOREX PIPELINE")
     logger.info("=" * 60)
     
-    # Major currency pairs
-    pairs = [
-        ('EUR', 'USD'),
-        ('GBP', 'USD'),
-        ('USD', 'JPY')
-    ]
+    # Major currencies against USD
+    base_currency = 'USD'
+    target_currencies = ['EUR', 'GBP', 'JPY']
     
     # Extract
-    logger.info(f"Extracting forex data for pairs: {pairs}")
-    extractor = ForexExtractor(api_key)
-    raw_data = extractor.extract_multiple_pairs(pairs)
+    logger.info(f"Extracting forex data for {base_currency} to: {target_currencies}")
+    extractor = ForexExtractor()
+    raw_data = extractor.extract_exchange_rates(base_currency, target_currencies)
     
     if not raw_data:
         logger.warning("No forex data extracted")
@@ -175,18 +186,12 @@ def run_forex_pipeline(api_key: str, data_dir: Path):
     # Transform
     logger.info("Transforming forex data...")
     transformer = ForexTransformer()
-    transformed_data = []
-    
-    for forex in raw_data:
-        transformed = transformer.transform(forex)
-        if transformed:
-            transformed_data.append(transformed)
+    df = transformer.transform(raw_data)
     
-    # Convert to DataFrame and save
-    if transformed_data:
-        df = pd.DataFrame(transformed_data)
+    # Save
+    if not df.empty:
         output_file = data_dir / 'forex_output.csv'
-        df.to_csv(output_file, index=False)
+        save_csv(df, output_file)
         
         logger.info(f"\n{'='*60}")
         logger.info("FOREX DATA SAMPLE:")
@@ -206,7 +211,6 @@ def main():
     
     # Get API keys from environment
     alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY', 'demo')
-    exchange_rate_key = os.getenv('EXCHANGE_RATE_API_KEY', 'demo')
     
     if alpha_vantage_key == 'demo':
         logger.warning("Using demo API key - rate limits apply")
@@ -217,10 +221,16 @@ def main():
     logger.info(f"Output directory: {data_dir}\n")
     
     try:
-        # Run pipelines
-        run_stocks_pipeline(alpha_vantage_key, data_dir)
-        run_crypto_pipeline(data_dir)
-        run_forex_pipeline(exchange_rate_key, data_dir)
+        # Run pipelines concurrently - each hits a different API and
+        # writes its own output file
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(run_stocks_pipeline, alpha_vantage_key, data_dir),
+                executor.submit(run_crypto_pipeline, data_dir),
+                executor.submit(run_forex_pipeline, data_dir),
+            ]
+            for future in as_completed(futures):
+                future.result()
         
         print("\n" + "="*60)
         print("PIPELINE COMPLETED SUCCESSFULLY!")
@@ -5,7 +5,7 @@ Generates sample market data to demonstrate the ETL pipeline
 without requiring API keys. Perfect for testing and verification.
 
 Usage:
-    python demo_pipeline_sample.py
+    python demo_pipeline_sample.py [--rows N] [--verbose]
     
 Output:
     data/stocks_sample.csv
@@ -15,11 +15,12 @@ Output:
 
 import sys
 import os
+import csv
+import argparse
 import logging
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-import random
+import numpy as np
 
 # Configure logging
 logging.basicConfig(
@@ -36,226 +37,195 @@ def ensure_data_directory():
     return data_dir
 
 
-def generate_stocks_data(data_dir: Path):
+def write_records(records: list, output_file: Path, verbose: bool = False):
+    """
+    Write records to CSV and optionally print them as a table
+    
+    Args:
+        records: List of row dictionaries sharing the same keys
+        output_file: Destination CSV path
+        verbose: Print the records to stdout
+    """
+    fieldnames = list(records[0].keys())
+    
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(records)
+    
+    if verbose:
+        rows = [fieldnames] + [[str(record[key]) for key in fieldnames] for record in records]
+        widths = [max(len(row[i]) for row in rows) for i in range(len(fieldnames))]
+        for row in rows:
+            print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Sample universes: fixed attributes plus the +/- range each random column may drift by
+STOCKS = [
+    # symbol, company_name, base price, price range, change range, change % range,
+    # volume low, volume high, market cap
+    ('AAPL', 'Apple Inc.', 178.50, 5, 3, 2, 50000000, 100000000, 2800000000000),
+    ('MSFT', 'Microsoft Corporation', 405.20, 10, 5, 1.5, 20000000, 40000000, 3000000000000),
+    ('GOOGL', 'Alphabet Inc.', 142.30, 8, 4, 2.5, 15000000, 35000000, 1800000000000),
+    ('AMZN', 'Amazon.com Inc.', 175.80, 6, 3, 1.8, 30000000, 60000000, 1800000000000),
+    ('NVDA', 'NVIDIA Corporation', 720.50, 20, 10, 3, 25000000, 50000000, 1750000000000),
+]
+
+CRYPTOS = [
+    # symbol, name, base price, price range, market cap, volume low, volume high,
+    # change range, change % range
+    ('BTC', 'Bitcoin', 51250.00, 1000, 1000000000000, 20000000000, 40000000000, 5, 3),
+    ('ETH', 'Ethereum', 2980.00, 100, 350000000000, 10000000000, 20000000000, 100, 4),
+    ('ADA', 'Cardano', 0.58, 0.05, 20000000000, 300000000, 800000000, 0.05, 6),
+    ('SOL', 'Solana', 110.50, 10, 48000000000, 1500000000, 3000000000, 8, 5),
+    ('BNB', 'Binance Coin', 315.00, 15, 47000000000, 500000000, 1500000000, 10, 3.5),
+]
+
+FOREX_PAIRS = [
+    # base currency, quote currency, rate, bid, ask, quote range, change range, change % range
+    ('EUR', 'USD', 1.0850, 1.0848, 1.0852, 0.01, 0.005, 0.5),
+    ('GBP', 'USD', 1.2670, 1.2668, 1.2672, 0.01, 0.008, 0.6),
+    ('USD', 'JPY', 149.80, 149.78, 149.82, 1, 0.5, 0.4),
+    ('USD', 'CHF', 0.8745, 0.8743, 0.8747, 0.005, 0.004, 0.45),
+    ('AUD', 'USD', 0.6520, 0.6518, 0.6522, 0.008, 0.006, 0.9),
+]
+
+
+def _columns(universe: list, n_rows: int) -> list:
+    """
+    Expand a sample universe into per-row column arrays
+    
+    Rows cycle through the universe, so n_rows larger than the universe
+    repeats each entry with fresh random values.
+    
+    Args:
+        universe: List of attribute tuples
+        n_rows: Number of rows to generate
+        
+    Returns:
+        One NumPy array of length n_rows per tuple field
+    """
+    idx = np.arange(n_rows) % len(universe)
+    return [np.asarray(column)[idx] for column in zip(*universe)]
+
+
+def _to_records(columns: dict) -> list:
+    """
+    Zip column arrays into CSV-ready row dictionaries
+    
+    All rows of a batch share one UTC generation timestamp.
+    
+    Args:
+        columns: Mapping of column name to NumPy array
+        
+    Returns:
+        List of row dictionaries with native Python values
+    """
+    now = datetime.now(timezone.utc)
+    names = list(columns)
+    values = [column.tolist() for column in columns.values()]
+    return [dict(zip(names, row), timestamp=now) for row in zip(*values)]
+
+
+def generate_stocks_data(data_dir: Path, n_rows: int = len(STOCKS), verbose: bool = False):
     """Generate sample stock market data"""
     logger.info("=" * 60)
     logger.info("STOCKS DATA GENERATION")
     logger.info("=" * 60)
     
-    stocks_data = [
-        {
-            'symbol': 'AAPL',
-            'company_name': 'Apple Inc.',
-            'price': 178.50 + random.uniform(-5, 5),
-            'change': random.uniform(-3, 3),
-            'change_percent': random.uniform(-2, 2),
-            'volume': random.randint(50000000, 100000000),
-            'market_cap': 2800000000000,
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'MSFT',
-            'company_name': 'Microsoft Corporation',
-            'price': 405.20 + random.uniform(-10, 10),
-            'change': random.uniform(-5, 5),
-            'change_percent': random.uniform(-1.5, 1.5),
-            'volume': random.randint(20000000, 40000000),
-            'market_cap': 3000000000000,
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'GOOGL',
-            'company_name': 'Alphabet Inc.',
-            'price': 142.30 + random.uniform(-8, 8),
-            'change': random.uniform(-4, 4),
-            'change_percent': random.uniform(-2.5, 2.5),
-            'volume': random.randint(15000000, 35000000),
-            'market_cap': 1800000000000,
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'AMZN',
-            'company_name': 'Amazon.com Inc.',
-            'price': 175.80 + random.uniform(-6, 6),
-            'change': random.uniform(-3, 3),
-            'change_percent': random.uniform(-1.8, 1.8),
-            'volume': random.randint(30000000, 60000000),
-            'market_cap': 1800000000000,
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'NVDA',
-            'company_name': 'NVIDIA Corporation',
-            'price': 720.50 + random.uniform(-20, 20),
-            'change': random.uniform(-10, 10),
-            'change_percent': random.uniform(-3, 3),
-            'volume': random.randint(25000000, 50000000),
-            'market_cap': 1750000000000,
-            'timestamp': datetime.utcnow()
-        }
-    ]
+    rng = np.random.default_rng()
+    (symbol, company_name, base_price, price_range, change_range, change_pct_range,
+     volume_low, volume_high, market_cap) = _columns(STOCKS, n_rows)
+    
+    stocks_data = _to_records({
+        'symbol': symbol,
+        'company_name': company_name,
+        'price': base_price + rng.uniform(-price_range, price_range),
+        'change': rng.uniform(-change_range, change_range),
+        'change_percent': rng.uniform(-change_pct_range, change_pct_range),
+        'volume': rng.integers(volume_low, volume_high, endpoint=True),
+        'market_cap': market_cap,
+    })
     
-    df = pd.DataFrame(stocks_data)
     output_file = data_dir / 'stocks_sample.csv'
-    df.to_csv(output_file, index=False)
     
     logger.info(f"\n{'='*60}")
     logger.info("STOCKS DATA SAMPLE:")
     logger.info(f"{'='*60}")
-    print(df.to_string())
-    logger.info(f"\n✓ Saved {len(df)} stock records to: {output_file}")
+    write_records(stocks_data, output_file, verbose)
+    logger.info(f"\n✓ Saved {len(stocks_data)} stock records to: {output_file}")
     logger.info(f"{'='*60}\n")
 
 
-def generate_crypto_data(data_dir: Path):
+def generate_crypto_data(data_dir: Path, n_rows: int = len(CRYPTOS), verbose: bool = False):
     """Generate sample cryptocurrency data"""
     logger.info("=" * 60)
     logger.info("CRYPTOCURRENCY DATA GENERATION")
     logger.info("=" * 60)
     
-    crypto_data = [
-        {
-            'symbol': 'BTC',
-            'name': 'Bitcoin',
-            'price_usd': 51250.00 + random.uniform(-1000, 1000),
-            'market_cap': 1000000000000,
-            'volume_24h': random.randint(20000000000, 40000000000),
-            'change_24h': random.uniform(-5, 5),
-            'change_percent_24h': random.uniform(-3, 3),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'ETH',
-            'name': 'Ethereum',
-            'price_usd': 2980.00 + random.uniform(-100, 100),
-            'market_cap': 350000000000,
-            'volume_24h': random.randint(10000000000, 20000000000),
-            'change_24h': random.uniform(-100, 100),
-            'change_percent_24h': random.uniform(-4, 4),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'ADA',
-            'name': 'Cardano',
-            'price_usd': 0.58 + random.uniform(-0.05, 0.05),
-            'market_cap': 20000000000,
-            'volume_24h': random.randint(300000000, 800000000),
-            'change_24h': random.uniform(-0.05, 0.05),
-            'change_percent_24h': random.uniform(-6, 6),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'SOL',
-            'name': 'Solana',
-            'price_usd': 110.50 + random.uniform(-10, 10),
-            'market_cap': 48000000000,
-            'volume_24h': random.randint(1500000000, 3000000000),
-            'change_24h': random.uniform(-8, 8),
-            'change_percent_24h': random.uniform(-5, 5),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'symbol': 'BNB',
-            'name': 'Binance Coin',
-            'price_usd': 315.00 + random.uniform(-15, 15),
-            'market_cap': 47000000000,
-            'volume_24h': random.randint(500000000, 1500000000),
-            'change_24h': random.uniform(-10, 10),
-            'change_percent_24h': random.uniform(-3.5, 3.5),
-            'timestamp': datetime.utcnow()
-        }
-    ]
+    rng = np.random.default_rng()
+    (symbol, name, base_price, price_range, market_cap, volume_low, volume_high,
+     change_range, change_pct_range) = _columns(CRYPTOS, n_rows)
+    
+    crypto_data = _to_records({
+        'symbol': symbol,
+        'name': name,
+        'price_usd': base_price + rng.uniform(-price_range, price_range),
+        'market_cap': market_cap,
+        'volume_24h': rng.integers(volume_low, volume_high, endpoint=True),
+        'change_24h': rng.uniform(-change_range, change_range),
+        'change_percent_24h': rng.uniform(-change_pct_range, change_pct_range),
+    })
     
-    df = pd.DataFrame(crypto_data)
     output_file = data_dir / 'crypto_sample.csv'
-    df.to_csv(output_file, index=False)
     
     logger.info(f"\n{'='*60}")
     logger.info("CRYPTO DATA SAMPLE:")
     logger.info(f"{'='*60}")
-    print(df.to_string())
-    logger.info(f"\n✓ Saved {len(df)} crypto records to: {output_file}")
+    write_records(crypto_data, output_file, verbose)
+    logger.info(f"\n✓ Saved {len(crypto_data)} crypto records to: {output_file}")
     logger.info(f"{'='*60}\n")
 
 
-def generate_forex_data(data_dir: Path):
+def generate_forex_data(data_dir: Path, n_rows: int = len(FOREX_PAIRS), verbose: bool = False):
     """Generate sample forex data"""
     logger.info("=" * 60)
     logger.info("FOREX DATA GENERATION")
     logger.info("=" * 60)
     
-    forex_data = [
-        {
-            'pair': 'EUR/USD',
-            'base_currency': 'EUR',
-            'quote_currency': 'USD',
-            'rate': 1.0850 + random.uniform(-0.01, 0.01),
-            'bid': 1.0848 + random.uniform(-0.01, 0.01),
-            'ask': 1.0852 + random.uniform(-0.01, 0.01),
-            'change': random.uniform(-0.005, 0.005),
-            'change_percent': random.uniform(-0.5, 0.5),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'pair': 'GBP/USD',
-            'base_currency': 'GBP',
-            'quote_currency': 'USD',
-            'rate': 1.2670 + random.uniform(-0.01, 0.01),
-            'bid': 1.2668 + random.uniform(-0.01, 0.01),
-            'ask': 1.2672 + random.uniform(-0.01, 0.01),
-            'change': random.uniform(-0.008, 0.008),
-            'change_percent': random.uniform(-0.6, 0.6),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'pair': 'USD/JPY',
-            'base_currency': 'USD',
-            'quote_currency': 'JPY',
-            'rate': 149.80 + random.uniform(-1, 1),
-            'bid': 149.78 + random.uniform(-1, 1),
-            'ask': 149.82 + random.uniform(-1, 1),
-            'change': random.uniform(-0.5, 0.5),
-            'change_percent': random.uniform(-0.4, 0.4),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'pair': 'USD/CHF',
-            'base_currency': 'USD',
-            'quote_currency': 'CHF',
-            'rate': 0.8745 + random.uniform(-0.005, 0.005),
-            'bid': 0.8743 + random.uniform(-0.005, 0.005),
-            'ask': 0.8747 + random.uniform(-0.005, 0.005),
-            'change': random.uniform(-0.004, 0.004),
-            'change_percent': random.uniform(-0.45, 0.45),
-            'timestamp': datetime.utcnow()
-        },
-        {
-            'pair': 'AUD/USD',
-            'base_currency': 'AUD',
-            'quote_currency': 'USD',
-            'rate': 0.6520 + random.uniform(-0.008, 0.008),
-            'bid': 0.6518 + random.uniform(-0.008, 0.008),
-            'ask': 0.6522 + random.uniform(-0.008, 0.008),
-            'change': random.uniform(-0.006, 0.006),
-            'change_percent': random.uniform(-0.9, 0.9),
-            'timestamp': datetime.utcnow()
-        }
-    ]
+    rng = np.random.default_rng()
+    (base_currency, quote_currency, rate, bid, ask, quote_range,
+     change_range, change_pct_range) = _columns(FOREX_PAIRS, n_rows)
+    
+    forex_data = _to_records({
+        'pair': np.char.add(np.char.add(base_currency, '/'), quote_currency),
+        'base_currency': base_currency,
+        'quote_currency': quote_currency,
+        'rate': rate + rng.uniform(-quote_range, quote_range),
+        'bid': bid + rng.uniform(-quote_range, quote_range),
+        'ask': ask + rng.uniform(-quote_range, quote_range),
+        'change': rng.uniform(-change_range, change_range),
+        'change_percent': rng.uniform(-change_pct_range, change_pct_range),
+    })
     
-    df = pd.DataFrame(forex_data)
     output_file = data_dir / 'forex_sample.csv'
-    df.to_csv(output_file, index=False)
     
     logger.info(f"\n{'='*60}")
     logger.info("FOREX DATA SAMPLE:")
     logger.info(f"{'='*60}")
-    print(df.to_string())
-    logger.info(f"\n✓ Saved {len(df)} forex records to: {output_file}")
+    write_records(forex_data, output_file, verbose)
+    logger.info(f"\n✓ Saved {len(forex_data)} forex records to: {output_file}")
     logger.info(f"{'='*60}\n")
 
 
 def main():
     """Generate sample financial markets data"""
+    parser = argparse.ArgumentParser(description="Generate sample financial markets data")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="Rows per dataset (defaults to one per sample instrument)")
+    parser.add_argument('--verbose', action='store_true', help="Print generated records")
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("FINANCIAL MARKETS PIPELINE DEMO - SAMPLE DATA")
     print("="*60 + "\n")
@@ -266,9 +236,9 @@ def main():
     
     try:
         # Generate sample data
-        generate_stocks_data(data_dir)
-        generate_crypto_data(data_dir)
-        generate_forex_data(data_dir)
+        generate_stocks_data(data_dir, args.rows or len(STOCKS), args.verbose)
+        generate_crypto_data(data_dir, args.rows or len(CRYPTOS), args.verbose)
+        generate_forex_data(data_dir, args.rows or len(FOREX_PAIRS), args.verbose)
         
         print("\n" + "="*60)
         print("SAMPLE DATA GENERATION COMPLETED!")
@@ -4,11 +4,23 @@ Provides retry logic and error handling
 """
 import requests
 import logging
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# orjson parses large API payloads several times faster; the stdlib parser
+# returns identical objects when it is not installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    import json
+    json_loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
 
 class BaseExtractor:
     """Base class for financial API extractors"""
@@ -18,10 +30,26 @@ class BaseExtractor:
         self.timeout = timeout
         self.max_retries = max_retries
         
+        # Keep-alive session so repeated calls reuse one TCP/TLS connection
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+        
     def get(self, endpoint: str = "", params: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         """
         Make GET request with retry logic
         
+        Retries with exponential backoff are handled by the session's
+        HTTP adapter.
+        
         Args:
             endpoint: API endpoint path
             params: Query parameters
@@ -31,26 +59,30 @@ class BaseExtractor:
         """
         url = f"{self.base_url}/{endpoint}" if endpoint else self.base_url
         
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"Requesting {url} (attempt {attempt + 1}/{self.max_retries})")
-                
-                response = requests.get(
-                    url,
-                    params=params,
-                    timeout=self.timeout
-                )
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed: {e}")
-                
-                if attempt < self.max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Max retries reached for {url}")
-                    return None
+        try:
+            logger.info(f"Requesting {url}")
+            
+            response = self.session.get(
+                url,
+                params=params,
+                timeout=self.timeout
+            )
+            
+            response.raise_for_status()
+            return json_loads(response.content)
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request failed after {self.max_retries} retries for {url}: {e}")
+            return None
+        except JSONDecodeError as e:
+            logger.error(f"Invalid JSON response from {url}: {e}")
+            return None
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+        
+    def __del__(self):
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
@@ -3,11 +3,19 @@ Cryptocurrency Data Extractor
 Fetches crypto prices from CoinGecko API
 """
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, Callable
+from cachetools import TTLCache, LRUCache
 from .base_extractor import BaseExtractor
 
 logger = logging.getLogger(__name__)
 
+# Responses shared across extractor instances, keyed by (endpoint, sorted coin ids)
+_response_cache = TTLCache(maxsize=1024, ttl=30)
+# Last successful response per key, served when a refresh fails (e.g. HTTP 429)
+_last_good = LRUCache(maxsize=1024)
+_cache_lock = threading.Lock()
+
 
 class CryptoExtractor(BaseExtractor):
     """Extract cryptocurrency data from CoinGecko API"""
@@ -15,6 +23,40 @@ class CryptoExtractor(BaseExtractor):
     def __init__(self):
         super().__init__(base_url="https://api.coingecko.com/api/v3")
         
+    def _cached(self, endpoint: str, coin_ids: List[str], fetch: Callable) -> Optional[List[Dict]]:
+        """
+        Serve a response from the TTL cache, fetching it on a miss
+        
+        Args:
+            endpoint: API endpoint the response comes from
+            coin_ids: List of coin IDs
+            fetch: Callable performing the request for coin_ids
+            
+        Returns:
+            Fresh or cached response, the last known good response if the
+            fetch failed, or None
+        """
+        key = (endpoint, tuple(sorted(coin_ids)))
+        
+        with _cache_lock:
+            cached = _response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Using cached {endpoint} response for {len(coin_ids)} coins")
+            return cached
+            
+        result = fetch(coin_ids)
+        
+        with _cache_lock:
+            if result is not None:
+                _response_cache[key] = result
+                _last_good[key] = result
+                return result
+            stale = _last_good.get(key)
+            
+        if stale is not None:
+            logger.warning(f"Serving last known good {endpoint} response")
+        return stale
+        
     def extract_crypto_prices(self, coin_ids: List[str]) -> Optional[List[Dict]]:
         """
         Extract current prices for cryptocurrency coins
@@ -25,6 +67,10 @@ class CryptoExtractor(BaseExtractor):
         Returns:
             List of crypto data
         """
+        return self._cached("simple/price", coin_ids, self._fetch_crypto_prices)
+        
+    def _fetch_crypto_prices(self, coin_ids: List[str]) -> Optional[List[Dict]]:
+        """Request current prices from the simple/price endpoint"""
         logger.info(f"Extracting crypto data for: {', '.join(coin_ids)}")
         
         params = {
@@ -32,7 +78,8 @@ class CryptoExtractor(BaseExtractor):
             'vs_currencies': 'usd',
             'include_market_cap': 'true',
             'include_24hr_vol': 'true',
-            'include_24hr_change': 'true'
+            'include_24hr_change': 'true',
+            'include_last_updated_at': 'true'
         }
         
         data = self.get(endpoint="simple/price", params=params)
@@ -62,6 +109,10 @@ class CryptoExtractor(BaseExtractor):
         Returns:
             List of detailed crypto data
         """
+        return self._cached("coins/markets", coin_ids, self._fetch_crypto_details)
+        
+    def _fetch_crypto_details(self, coin_ids: List[str]) -> Optional[List[Dict]]:
+        """Request detailed market data from the coins/markets endpoint"""
         logger.info(f"Extracting detailed crypto data for {len(coin_ids)} coins")
         
         params = {
@@ -31,14 +31,15 @@ class ForexExtractor(BaseExtractor):
         data = self.get(endpoint=base_currency)
         
         if data and 'rates' in data:
-            # Filter for requested currencies
+            # Filter for requested currencies, one lookup per unique target
+            all_rates = data['rates']
             filtered_rates = {
                 'base': base_currency,
                 'date': data.get('date'),
                 'rates': {
-                    currency: data['rates'].get(currency)
-                    for currency in target_currencies
-                    if currency in data['rates']
+                    currency: rate
+                    for currency in dict.fromkeys(target_currencies)
+                    if (rate := all_rates.get(currency)) is not None
                 }
             }
             
@@ -2,41 +2,126 @@
 Stock Market Data Extractor
 Fetches stock prices from Alpha Vantage API
 """
+import asyncio
 import logging
-import time
-from typing import List, Dict, Optional
-from .base_extractor import BaseExtractor
+import random
+import httpx
+from datetime import date
+from aiolimiter import AsyncLimiter
+from typing import Iterator, List, Dict, Optional
+from .base_extractor import BaseExtractor, JSONDecodeError, json_loads
 
 logger = logging.getLogger(__name__)
 
 
+def _chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    """Yield successive lists of at most size items"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 class StocksExtractor(BaseExtractor):
     """Extract stock market data from Alpha Vantage API"""
     
-    def __init__(self, api_key: str):
+    # Maximum symbols accepted by one REALTIME_BULK_QUOTES request
+    BULK_QUOTES_LIMIT = 100
+    # Symbols packed into each BATCH_STOCK_QUOTES request
+    BATCH_QUOTES_SIZE = 20
+    # Token bucket size; with the default 12s delay this is 5 requests per minute
+    RATE_LIMIT = 5
+    # Concurrent connections for per-symbol requests
+    MAX_CONNECTIONS = 8
+    # Seconds before a premium endpoint the key was refused is probed again
+    ENDPOINT_RECHECK = 7 * 86400
+    # Endpoints whose quotes carry every GLOBAL_QUOTE field and may be served from cache
+    COMPLETE_SOURCES = ('GLOBAL_QUOTE', 'REALTIME_BULK_QUOTES')
+    
+    def __init__(self, api_key: str, cache=None):
+        """
+        Args:
+            api_key: Alpha Vantage API key
+            cache: Optional response cache (e.g. tools.cache.FileCache);
+                quotes found there skip the API entirely
+        """
         super().__init__(base_url="https://www.alphavantage.co/query")
         self.api_key = api_key
+        self.cache = cache
         
-    def extract_stock_price(self, symbol: str) -> Optional[Dict]:
-        """
-        Extract current price for a stock symbol
+        # Shared by every batch so the per-key quota carries across calls
+        self._limiter = None
+        # Event loop time before which no request should be sent
+        self._resume_at = 0.0
+        # Premium endpoints this key turned out not to be entitled to
+        self._unavailable = set()
         
-        Args:
-            symbol: Stock ticker (e.g., 'AAPL', 'GOOGL')
+    def _cache_key(self, symbol: str, source: str) -> str:
+        """Cache key for today's quote of a symbol from one endpoint"""
+        return self.cache.make_key(fn=source, symbol=symbol, day=date.today().isoformat())
+        
+    def _cached_quote(self, symbol: str) -> Optional[Dict]:
+        """Look up a complete quote in the cache, if one is configured"""
+        if self.cache is None:
+            return None
             
-        Returns:
-            Stock data dictionary
+        for source in self.COMPLETE_SOURCES:
+            quote = self.cache.get(self._cache_key(symbol, source))
+            if quote is not None:
+                logger.info(f"Using cached data for {symbol}")
+                return quote
+        return None
+        
+    def _store_quote(self, symbol: str, quote: Optional[Dict], source: str = 'GLOBAL_QUOTE'):
+        """Store a successfully extracted quote in the cache under the endpoint it came from"""
+        if self.cache is not None and quote is not None:
+            self.cache.set(self._cache_key(symbol, source), quote)
+        
+    def _endpoint_key(self, function: str) -> str:
+        """Cache key recording that this API key was refused an endpoint"""
+        return self.cache.make_key(fn=function, apikey=self.api_key, unavailable=True)
+        
+    def _is_unavailable(self, function: str) -> bool:
+        """Check whether an endpoint was refused in this or a recent run"""
+        if function in self._unavailable:
+            return True
+        if self.cache is not None and self.cache.get(self._endpoint_key(function), ttl=self.ENDPOINT_RECHECK):
+            self._unavailable.add(function)
+            return True
+        return False
+        
+    @staticmethod
+    def _is_refusal(data: Dict) -> bool:
         """
-        logger.info(f"Extracting stock data for: {symbol}")
+        Check whether a reply without data means the key is not entitled to an endpoint
         
-        params = {
+        Alpha Vantage answers both a refused premium endpoint and an
+        exhausted quota with HTTP 200 and a 'Note' or 'Information' message.
+        Only the former says so explicitly; throttling replies (which also
+        advertise the premium plans) are transient and must not disable
+        the endpoint.
+        """
+        message = str(data.get('Information') or data.get('Error Message') or '').lower()
+        throttled = 'Note' in data or 'rate limit' in message or 'call frequency' in message
+        return 'premium endpoint' in message and not throttled
+        
+    def _mark_unavailable(self, function: str):
+        """Remember that an endpoint answered without data, so it is not probed again"""
+        logger.warning(f"{function} unavailable for this API key, falling back to other endpoints")
+        self._unavailable.add(function)
+        if self.cache is not None:
+            self.cache.set(self._endpoint_key(function), {'unavailable': True})
+        
+    def _quote_params(self, symbol: str) -> Dict:
+        """Build GLOBAL_QUOTE query parameters for a symbol"""
+        return {
             'function': 'GLOBAL_QUOTE',
             'symbol': symbol,
             'apikey': self.api_key
         }
         
-        data = self.get(params=params)
-        
+    @staticmethod
+    def _parse_quote(symbol: str, data: Optional[Dict]) -> Optional[Dict]:
+        """Extract the quote for a symbol from a GLOBAL_QUOTE response"""
         if data and 'Global Quote' in data:
             quote = data['Global Quote']
             if quote:  # Check if quote is not empty
@@ -51,29 +136,276 @@ class StocksExtractor(BaseExtractor):
         else:
             logger.error(f"Failed to extract data for {symbol}")
             return None
+        
+    def extract_stock_price(self, symbol: str) -> Optional[Dict]:
+        """
+        Extract current price for a stock symbol
+        
+        Args:
+            symbol: Stock ticker (e.g., 'AAPL', 'GOOGL')
+            
+        Returns:
+            Stock data dictionary
+        """
+        cached = self._cached_quote(symbol)
+        if cached is not None:
+            return cached
+            
+        logger.info(f"Extracting stock data for: {symbol}")
+        
+        data = self.get(params=self._quote_params(symbol))
+        
+        quote = self._parse_quote(symbol, data)
+        self._store_quote(symbol, quote)
+        return quote
     
-    def extract_multiple_stocks(self, symbols: List[str], delay: int = 12) -> List[Dict]:
+    async def extract_stock_price_async(self, client: httpx.AsyncClient, limiter: AsyncLimiter,
+                                        symbol: str) -> Optional[Dict]:
+        """
+        Extract current price for a stock symbol without blocking the event loop
+        
+        Args:
+            client: Shared async HTTP client
+            limiter: Rate limiter shared by all requests of the batch
+            symbol: Stock ticker
+            
+        Returns:
+            Stock data dictionary
+        """
+        cached = self._cached_quote(symbol)
+        if cached is not None:
+            return cached
+            
+        data = None
+        
+        for attempt in range(self.max_retries):
+            await self._wait_for_quota()
+            
+            async with limiter:
+                logger.info(f"Extracting stock data for: {symbol} (attempt {attempt + 1}/{self.max_retries})")
+                try:
+                    response = await client.get(self.base_url, params=self._quote_params(symbol))
+                    if response.headers.get('X-RateLimit-Remaining') == '0':
+                        self._pause(self._retry_after(response.headers, 1))
+                    response.raise_for_status()
+                    data = json_loads(response.content)
+                    break
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 429 or attempt == self.max_retries - 1:
+                        logger.error(f"Request failed for {symbol}: {e}")
+                        break
+                    
+                    # Exponential backoff with jitter unless the API says how long to wait
+                    wait_time = self._retry_after(e.response.headers, 2 ** attempt + random.random())
+                    self._pause(wait_time)
+                    logger.info(f"Rate limited on {symbol}, retrying in {wait_time:.1f} seconds...")
+                except (httpx.HTTPError, JSONDecodeError) as e:
+                    logger.error(f"Request failed for {symbol}: {e}")
+                    break
+            
+        quote = self._parse_quote(symbol, data)
+        self._store_quote(symbol, quote)
+        return quote
+        
+    @staticmethod
+    def _retry_after(headers: httpx.Headers, default: float) -> float:
+        """Seconds to wait according to a Retry-After header"""
+        try:
+            return float(headers['Retry-After'])
+        except (KeyError, ValueError):
+            return default
+            
+    def _pause(self, seconds: float):
+        """Hold back every pending request for the given number of seconds"""
+        self._resume_at = max(self._resume_at, asyncio.get_running_loop().time() + seconds)
+        
+    async def _wait_for_quota(self):
+        """Sleep until any pause requested by the API has passed"""
+        remaining = self._resume_at - asyncio.get_running_loop().time()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+            
+    async def _gather(self, symbols: List[str], delay: float) -> List[Optional[Dict]]:
+        """Fetch all symbols concurrently, paced by a shared token bucket"""
+        time_period = self.RATE_LIMIT * delay
+        if self._limiter is None or self._limiter.time_period != time_period:
+            self._limiter = AsyncLimiter(max_rate=self.RATE_LIMIT, time_period=time_period)
+        limits = httpx.Limits(max_connections=self.MAX_CONNECTIONS)
+        
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            return await asyncio.gather(
+                *(self.extract_stock_price_async(client, self._limiter, symbol) for symbol in symbols)
+            )
+    
+    def extract_multiple_stocks(self, symbols: List[str], delay: float = 12) -> List[Dict]:
         """
         Extract data for multiple stock symbols
         
+        Complete quotes already in the cache are served without any
+        request; BATCH_STOCK_QUOTES results lack most fields and are never
+        cached, so the next run asks for those symbols again. The
+        rest are dispatched over the available endpoints in order: one
+        REALTIME_BULK_QUOTES request, then BATCH_STOCK_QUOTES requests, then
+        one GLOBAL_QUOTE request per remaining symbol. Each tier only gets
+        the symbols earlier tiers did not return, and endpoints the key is
+        not entitled to are skipped after the first refusal (remembered in
+        the cache for ENDPOINT_RECHECK seconds).
+        
+        Per-symbol requests run concurrently and, instead of sleeping between
+        calls, draw from a token bucket of RATE_LIMIT requests that refills
+        at one token every `delay` seconds. Requests only pause further when
+        the API reports an exhausted quota (X-RateLimit-Remaining: 0 or a
+        429), for as long as its Retry-After header asks.
+        
         Args:
             symbols: List of stock tickers
-            delay: Delay between API calls (Alpha Vantage rate limit)
+            delay: Average delay between API calls (Alpha Vantage rate limit)
             
         Returns:
-            List of stock data
+            List of stock data, in the order of symbols
         """
         results = []
+        remaining = []
         
-        for i, symbol in enumerate(symbols):
-            data = self.extract_stock_price(symbol)
-            if data:
-                results.append(data)
-            
-            # Add delay between calls (except for last one)
-            if i < len(symbols) - 1:
-                logger.info(f"Waiting {delay}s before next request (rate limit)...")
-                time.sleep(delay)
+        # Serve whatever the cache holds before making any request
+        for symbol in symbols:
+            cached = self._cached_quote(symbol)
+            if cached is not None:
+                results.append(cached)
+            else:
+                remaining.append(symbol)
                 
+        for function, fetch in (('REALTIME_BULK_QUOTES', self.extract_bulk_quotes),
+                                ('BATCH_STOCK_QUOTES', self.extract_stocks_batch)):
+            if not remaining or self._is_unavailable(function):
+                continue
+                
+            quotes = fetch(remaining)
+            if quotes:
+                if function in self.COMPLETE_SOURCES:
+                    for quote in quotes:
+                        self._store_quote(quote['symbol'], quote, function)
+                results.extend(quotes)
+                fetched = {quote['symbol'] for quote in quotes}
+                remaining = [symbol for symbol in remaining if symbol not in fetched]
+                
+        if remaining:
+            results.extend(data for data in asyncio.run(self._gather(remaining, delay)) if data)
+            
+        order = {symbol: i for i, symbol in enumerate(symbols)}
+        results.sort(key=lambda quote: order.get(quote['symbol'], len(order)))
+        
         logger.info(f"Extracted data for {len(results)}/{len(symbols)} stocks")
         return results
+    
+    def extract_bulk_quotes(self, symbols: List[str]) -> Optional[List[Dict]]:
+        """
+        Extract quotes for several symbols in a single REALTIME_BULK_QUOTES request
+        
+        Quotes are returned in the same shape as extract_stock_price so they
+        can be passed straight to StocksTransformer.
+        
+        Args:
+            symbols: List of stock tickers (at most BULK_QUOTES_LIMIT)
+            
+        Returns:
+            List of stock data, or None if the request failed or the bulk
+            endpoint is unavailable (e.g. the API key is not entitled to it)
+        """
+        if not symbols or len(symbols) > self.BULK_QUOTES_LIMIT:
+            return None
+            
+        logger.info(f"Extracting bulk quotes for: {', '.join(symbols)}")
+        
+        params = {
+            'function': 'REALTIME_BULK_QUOTES',
+            'symbol': ','.join(symbols),
+            'apikey': self.api_key
+        }
+        
+        data = self.get(params=params)
+        
+        if data is None:
+            return None
+        if 'data' not in data:
+            if self._is_refusal(data):
+                self._mark_unavailable('REALTIME_BULK_QUOTES')
+            else:
+                logger.warning(f"REALTIME_BULK_QUOTES returned no data: {data}")
+            return None
+            
+        results = []
+        for quote in data['data']:
+            results.append({
+                'symbol': quote.get('symbol'),
+                'data': {
+                    '01. symbol': quote.get('symbol'),
+                    '02. open': quote.get('open'),
+                    '03. high': quote.get('high'),
+                    '04. low': quote.get('low'),
+                    '05. price': quote.get('close'),
+                    '06. volume': quote.get('volume'),
+                    '07. latest trading day': (quote.get('timestamp') or '')[:10] or None,
+                    '08. previous close': quote.get('previous_close'),
+                    '09. change': quote.get('change'),
+                    '10. change percent': quote.get('change_percent')
+                }
+            })
+            
+        logger.info(f"Extracted bulk quotes for {len(results)}/{len(symbols)} stocks")
+        return results
+    
+    def extract_stocks_batch(self, symbols: List[str]) -> Optional[List[Dict]]:
+        """
+        Extract quotes through BATCH_STOCK_QUOTES, BATCH_QUOTES_SIZE symbols per request
+        
+        The endpoint only reports price and volume; quotes are returned in
+        the GLOBAL_QUOTE shape with the remaining fields left out, so they
+        load as NULL rather than as made-up zeros.
+
+        A failed or throttled chunk stops the batch; quotes from the chunks
+        before it are still returned so only the missing symbols fall
+        through to the next tier.
+        
+        Args:
+            symbols: List of stock tickers
+            
+        Returns:
+            List of stock data, or None if no chunk returned any quote
+        """
+        results = []
+        
+        for chunk in _chunked(symbols, self.BATCH_QUOTES_SIZE):
+            logger.info(f"Extracting batch quotes for: {', '.join(chunk)}")
+            
+            params = {
+                'function': 'BATCH_STOCK_QUOTES',
+                'symbols': ','.join(chunk),
+                'apikey': self.api_key
+            }
+            
+            data = self.get(params=params)
+            
+            if data is None:
+                break
+            if 'Stock Quotes' not in data:
+                if self._is_refusal(data):
+                    self._mark_unavailable('BATCH_STOCK_QUOTES')
+                else:
+                    logger.warning(f"BATCH_STOCK_QUOTES returned no data: {data}")
+                break
+                
+            for quote in data['Stock Quotes']:
+                symbol = quote.get('1. symbol')
+                results.append({
+                    'symbol': symbol,
+                    'data': {
+                        '01. symbol': symbol,
+                        '05. price': quote.get('2. price'),
+                        '06. volume': quote.get('3. volume'),
+                        '07. latest trading day': (quote.get('4. timestamp') or '')[:10] or None
+                    }
+                })
+                
+        logger.info(f"Extracted batch quotes for {len(results)}/{len(symbols)} stocks")
+        return results or None
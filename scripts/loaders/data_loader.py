@@ -3,11 +3,135 @@ Data Loader
 Loads transformed financial data into database
 """
 import logging
+import threading
 import pandas as pd
-from .database_schema import DatabaseManager, Stock, Crypto, Forex
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from sqlalchemy import Table, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.expression import Insert
+from typing import Callable, Dict, Iterable, Union
+from .database_schema import Base, DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Rows per executemany batch or multi-row INSERT statement
+MULTI_INSERT_CHUNKSIZE = 1000
+# Bound parameters allowed per statement by older SQLite builds
+SQLITE_MAX_VARIABLES = 999
+# Buffered rows that trigger a flush when streaming DataFrames
+STREAM_BATCH_ROWS = 10_000
+
+# SQLite allows a single writer, so concurrent loads take turns instead of
+# failing on a locked database
+_sqlite_write_lock = threading.Lock()
+
+# Tables whose rows are refreshed when the same key is loaded again, mapped
+# to the columns of their unique index; later intraday or post-close runs
+# then update the day's stock quote instead of being dropped
+_UPSERT_KEYS = {
+    'stocks': ('symbol', 'latest_trading_day'),
+}
+
+
+def _dedup_insert(table: Table, dialect: str, columns: Iterable[str]) -> Insert:
+    """
+    INSERT statement that handles rows violating a unique index
+    
+    Tables in _UPSERT_KEYS are upserted: a conflicting row gets the new
+    values of every other inserted column, keeping the stored value where
+    the new one is NULL. Other tables skip conflicting rows. Emits
+    INSERT ... ON CONFLICT on SQLite and PostgreSQL and INSERT ... ON
+    DUPLICATE KEY UPDATE / INSERT IGNORE on MySQL; other backends get a
+    plain INSERT.
+    
+    Args:
+        table: Target table
+        dialect: SQLAlchemy dialect name
+        columns: Names of the columns being inserted
+        
+    Returns:
+        Insert statement
+    """
+    keys = _UPSERT_KEYS.get(table.name)
+    updated = [name for name in columns if keys and name not in keys and name != 'id']
+    
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        if not updated:
+            return stmt.on_conflict_do_nothing()
+        return stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: func.coalesce(stmt.excluded[name], table.c[name]) for name in updated}
+        )
+    if dialect == 'mysql':
+        if not updated:
+            return table.insert().prefix_with('IGNORE')
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        return stmt.on_duplicate_key_update(
+            {name: func.coalesce(stmt.inserted[name], table.c[name]) for name in updated}
+        )
+    return table.insert()
+
+
+def insert_on_conflict(pd_table, conn, keys, data_iter) -> int:
+    """
+    pandas to_sql method that upserts or skips rows violating a unique index
+    
+    Re-running the pipeline for the same day then refreshes stock quotes
+    and inserts nothing new elsewhere, instead of duplicating rows.
+    
+    Args:
+        pd_table: pandas SQLTable being written
+        conn: SQLAlchemy connection
+        keys: Column names
+        data_iter: Iterable of row tuples
+        
+    Returns:
+        Number of rows inserted or updated
+    """
+    rows = [dict(zip(keys, row)) for row in data_iter]
+    stmt = _dedup_insert(pd_table.table, conn.dialect.name, keys).values(rows)
+    return conn.execute(stmt).rowcount
+
+
+class _InsertBuffer:
+    """Accumulate DataFrame fragments for one table and insert them together"""
+    
+    def __init__(self, loader: 'DataLoader', table: str):
+        self._loader = loader
+        self._table = table
+        self._q = deque()
+        self.rows = 0
+        
+    def add(self, df: pd.DataFrame):
+        """Queue a fragment for the next flush"""
+        if not df.empty:
+            self._q.append(df)
+            self.rows += len(df)
+            
+    def flush(self) -> int:
+        """
+        Insert all queued fragments in a single transaction
+        
+        Returns:
+            Number of records inserted
+        """
+        if not self._q:
+            return 0
+            
+        df = pd.concat(list(self._q), ignore_index=True)
+        self._q.clear()
+        self.rows = 0
+        
+        return self._loader._bulk_to_sql(df, self._table)
+
 
 class DataLoader:
     """Load financial data into database"""
@@ -16,16 +140,105 @@ class DataLoader:
         self.db_manager = DatabaseManager(db_path)
         self.db_manager.connect()
         self.db_manager.create_tables()
+        self._buffers: Dict[str, _InsertBuffer] = {}
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def close(self):
+        """Flush any rows still buffered by streaming loads and release connections"""
+        try:
+            for buffer in self._buffers.values():
+                buffer.flush()
+        finally:
+            self.db_manager.engine.dispose()
+        
+    def _bulk_to_sql(self, df: pd.DataFrame, table: str, method: Union[str, Callable, None] = None) -> int:
+        """
+        Append a DataFrame to a table in a single transaction
+        
+        By default rows are sent straight through SQLAlchemy Core as one
+        executemany per MULTI_INSERT_CHUNKSIZE rows, so drivers such as
+        psycopg2 and pyodbc can batch them natively; rows already present
+        under a unique index are updated (stocks) or skipped (other
+        tables). Passing a pandas to_sql method instead routes the frame
+        through to_sql; 'multi' uses insert_on_conflict so it handles
+        duplicates the same way.
         
-    def load_stocks(self, df: pd.DataFrame) -> int:
+        Args:
+            df: DataFrame to insert
+            table: Target table name
+            method: Optional pandas to_sql insertion method ('multi' or a
+                to_sql callable). Custom callables, such as a COPY-based
+                loader for PostgreSQL, must handle duplicates themselves;
+                otherwise re-runs fail on the unique indexes.
+                
+        Returns:
+            Number of records inserted
+        """
+        dialect = self.db_manager.engine.dialect.name
+        write_lock = _sqlite_write_lock if dialect == 'sqlite' else nullcontext()
+        
+        if method == 'multi':
+            method = insert_on_conflict
+            
+        with write_lock, self.db_manager.engine.begin() as conn:
+            if method is None:
+                inserted = self._execute_many(conn, df, table)
+            else:
+                chunksize = MULTI_INSERT_CHUNKSIZE
+                if dialect == 'sqlite':
+                    chunksize = min(chunksize, max(1, SQLITE_MAX_VARIABLES // len(df.columns)))
+                    
+                inserted = df.to_sql(
+                    table,
+                    conn,
+                    if_exists='append',
+                    index=False,
+                    method=method,
+                    chunksize=chunksize
+                )
+                
+        # Some drivers don't report row counts for executemany
+        return len(df) if inserted is None or inserted < 0 else inserted
+        
+    @staticmethod
+    def _execute_many(conn: Connection, df: pd.DataFrame, table: str) -> int:
+        """
+        Insert a DataFrame with Core executemany calls
+        
+        Args:
+            conn: Connection inside an open transaction
+            df: DataFrame to insert
+            table: Target table name
+            
+        Returns:
+            Number of records inserted or updated
+        """
+        stmt = _dedup_insert(Base.metadata.tables[table], conn.dialect.name, df.columns)
+        
+        # Plain Python values with missing entries as None for the driver
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        
+        inserted = 0
+        for start in range(0, len(records), MULTI_INSERT_CHUNKSIZE):
+            inserted += conn.execute(stmt, records[start:start + MULTI_INSERT_CHUNKSIZE]).rowcount
+        return inserted
+        
+    def load_stocks(self, df: pd.DataFrame, method: Union[str, Callable, None] = None) -> int:
         """
         Load stock data to database
         
         Args:
             df: DataFrame with stock data
+            method: Optional pandas to_sql insertion method (see _bulk_to_sql)
             
         Returns:
-            Number of records inserted
+            Number of records inserted or updated; a quote already loaded
+            for the same symbol and trading day is refreshed
         """
         if df.empty:
             logger.warning("Empty stock data DataFrame, skipping load")
@@ -34,29 +247,25 @@ class DataLoader:
         logger.info(f"Loading {len(df)} stock records")
         
         try:
-            df.to_sql(
-                'stocks',
-                self.db_manager.engine,
-                if_exists='append',
-                index=False
-            )
+            inserted = self._bulk_to_sql(df, 'stocks', method)
             
-            logger.info(f"Successfully loaded {len(df)} stock records")
-            return len(df)
+            logger.info(f"Successfully loaded {inserted} stock records")
+            return inserted
             
         except Exception as e:
             logger.error(f"Failed to load stock data: {e}")
             raise
             
-    def load_crypto(self, df: pd.DataFrame) -> int:
+    def load_crypto(self, df: pd.DataFrame, method: Union[str, Callable, None] = None) -> int:
         """
         Load crypto data to database
         
         Args:
             df: DataFrame with crypto data
+            method: Optional pandas to_sql insertion method (see _bulk_to_sql)
             
         Returns:
-            Number of records inserted
+            Number of records inserted; rows already loaded are skipped
         """
         if df.empty:
             logger.warning("Empty crypto data DataFrame, skipping load")
@@ -65,29 +274,25 @@ class DataLoader:
         logger.info(f"Loading {len(df)} crypto records")
         
         try:
-            df.to_sql(
-                'crypto',
-                self.db_manager.engine,
-                if_exists='append',
-                index=False
-            )
+            inserted = self._bulk_to_sql(df, 'crypto', method)
             
-            logger.info(f"Successfully loaded {len(df)} crypto records")
-            return len(df)
+            logger.info(f"Successfully loaded {inserted} crypto records")
+            return inserted
             
         except Exception as e:
             logger.error(f"Failed to load crypto data: {e}")
             raise
             
-    def load_forex(self, df: pd.DataFrame) -> int:
+    def load_forex(self, df: pd.DataFrame, method: Union[str, Callable, None] = None) -> int:
         """
         Load forex data to database
         
         Args:
             df: DataFrame with forex data
+            method: Optional pandas to_sql insertion method (see _bulk_to_sql)
             
         Returns:
-            Number of records inserted
+            Number of records inserted; rows already loaded are skipped
         """
         if df.empty:
             logger.warning("Empty forex data DataFrame, skipping load")
@@ -96,33 +301,92 @@ class DataLoader:
         logger.info(f"Loading {len(df)} forex records")
         
         try:
-            df.to_sql(
-                'forex',
-                self.db_manager.engine,
-                if_exists='append',
-                index=False
-            )
+            inserted = self._bulk_to_sql(df, 'forex', method)
             
-            logger.info(f"Successfully loaded {len(df)} forex records")
-            return len(df)
+            logger.info(f"Successfully loaded {inserted} forex records")
+            return inserted
             
         except Exception as e:
             logger.error(f"Failed to load forex data: {e}")
             raise
             
-    def get_record_counts(self) -> dict:
-        """Get count of records in each table"""
-        session = self.db_manager.get_session()
+    def load_all(self, stocks_df: pd.DataFrame, crypto_df: pd.DataFrame, forex_df: pd.DataFrame) -> dict:
+        """
+        Load all three datasets concurrently
         
-        try:
-            stock_count = session.query(Stock).count()
-            crypto_count = session.query(Crypto).count()
-            forex_count = session.query(Forex).count()
-            
-            return {
-                'stocks': stock_count,
-                'crypto': crypto_count,
-                'forex': forex_count
+        Each table is loaded in its own thread, so on server backends the
+        inserts overlap on separate pooled connections. SQLite writes are
+        serialized by a lock.
+        
+        Args:
+            stocks_df: DataFrame with stock data
+            crypto_df: DataFrame with crypto data
+            forex_df: DataFrame with forex data
+            
+        Returns:
+            Number of records inserted per table
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'stocks': executor.submit(self.load_stocks, stocks_df),
+                'crypto': executor.submit(self.load_crypto, crypto_df),
+                'forex': executor.submit(self.load_forex, forex_df)
             }
-        finally:
-            session.close()
+            return {table: future.result() for table, future in futures.items()}
+            
+    def load_many(self, table: str, dfs: Iterable[pd.DataFrame], batch_rows: int = STREAM_BATCH_ROWS) -> int:
+        """
+        Load many small DataFrames with one commit per batch_rows rows
+        
+        Fragments are buffered and concatenated, so N per-symbol or
+        per-page frames cost about one transaction instead of N.
+        
+        Args:
+            table: Target table name
+            dfs: Iterable of DataFrames for that table
+            batch_rows: Buffered rows that trigger a flush
+            
+        Returns:
+            Number of records inserted
+        """
+        if table not in Base.metadata.tables:
+            raise ValueError(f"Unknown table: {table}")
+            
+        buffer = self._buffers.setdefault(table, _InsertBuffer(self, table))
+        inserted = 0
+        
+        for df in dfs:
+            buffer.add(df)
+            if buffer.rows >= batch_rows:
+                inserted += buffer.flush()
+                
+        inserted += buffer.flush()
+        
+        logger.info(f"Successfully loaded {inserted} {table} records")
+        return inserted
+        
+    def load_stocks_stream(self, df_iter: Iterable[pd.DataFrame], batch_rows: int = STREAM_BATCH_ROWS) -> int:
+        """
+        Load stock data arriving as many small DataFrames
+        
+        Args:
+            df_iter: Iterable of DataFrames with stock data
+            batch_rows: Buffered rows that trigger a flush
+            
+        Returns:
+            Number of records inserted
+        """
+        return self.load_many('stocks', df_iter, batch_rows)
+        
+    def get_record_counts(self) -> dict:
+        """Get count of records in each table in a single round trip"""
+        tables = Base.metadata.tables
+        query = select(*(
+            select(func.count()).select_from(tables[name]).scalar_subquery().label(name)
+            for name in ('stocks', 'crypto', 'forex')
+        ))
+        
+        with self.db_manager.engine.connect() as conn:
+            row = conn.execute(query).one()
+            
+        return dict(row._mapping)
@@ -2,22 +2,36 @@
 Database Schema Definitions
 Defines tables for financial market data
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+import sqlalchemy
+from sqlalchemy import create_engine, event, exc, Column, Index, Integer, String, Float, DateTime, Text
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 import logging
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Bump when tables or indexes change; create_tables() back-fills new indexes
+SCHEMA_VERSION = 3
+
+# psycopg2 rows-per-INSERT keyword; renamed in SQLAlchemy 2.0
+_PAGE_SIZE_ARG = ('insertmanyvalues_page_size' if int(sqlalchemy.__version__.split('.')[0]) >= 2
+                  else 'executemany_values_page_size')
+
 
 class Stock(Base):
     """Stock market data model"""
     __tablename__ = 'stocks'
+    __table_args__ = (
+        Index('ix_stocks_symbol_ts', 'symbol', 'timestamp'),
+        Index('uq_stocks_symbol_day', 'symbol', 'latest_trading_day', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(10))
+    symbol = Column(String(10), index=True)
     price = Column(Float)
     open = Column(Float)
     high = Column(Float)
@@ -34,9 +48,13 @@ class Stock(Base):
 class Crypto(Base):
     """Cryptocurrency data model"""
     __tablename__ = 'crypto'
+    __table_args__ = (
+        # timestamp holds CoinGecko's last_updated, not the extraction time
+        Index('uq_crypto_symbol_ts', 'symbol', 'timestamp', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(10))
+    symbol = Column(String(10), index=True)
     name = Column(String(100))
     current_price = Column(Float)
     market_cap = Column(Float)
@@ -49,6 +67,11 @@ class Crypto(Base):
 class Forex(Base):
     """Foreign exchange rate data model"""
     __tablename__ = 'forex'
+    __table_args__ = (
+        Index('ix_forex_pair', 'base_currency', 'target_currency'),
+        Index('ix_forex_date', 'rate_date'),
+        Index('uq_forex_pair_day', 'base_currency', 'target_currency', 'rate_date', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     base_currency = Column(String(3))
@@ -59,24 +82,109 @@ class Forex(Base):
     extracted_at = Column(DateTime)
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for bulk appends"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.close()
+
+
+def _enable_fast_executemany(conn, cursor, statement, parameters, context, executemany):
+    """Have pyodbc send executemany batches as a single parameter array"""
+    if executemany:
+        cursor.fast_executemany = True
+
+
 class DatabaseManager:
     """Manage database connections and operations"""
     
     def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file or a full SQLAlchemy URL
+        """
         self.db_path = db_path
         self.engine = None
         self.Session = None
         
+    @property
+    def url(self) -> URL:
+        """SQLAlchemy URL for db_path; plain paths are SQLite database files"""
+        if '://' in self.db_path:
+            return make_url(self.db_path)
+        return make_url(f'sqlite:///{self.db_path}')
+        
+    def _create_engine(self):
+        """
+        Create a pooled engine tuned for bulk appends on this backend
+        
+        Dialect hooks:
+            sqlite: QueuePool for file databases, PRAGMAs applied once per connection
+            mssql+pyodbc: cursor.fast_executemany for executemany calls
+            postgresql+psycopg2: executemany_mode='values_plus_batch',
+                1000 rows per INSERT ... VALUES page
+            other backends: default executemany behaviour
+        """
+        url = self.url
+        backend = url.get_backend_name()
+        driver = url.get_driver_name()
+        
+        if backend == 'sqlite':
+            # SQLAlchemy 1.4 defaults file databases to NullPool, which reopens
+            # the file (and reruns the PRAGMAs) on every checkout; ask for a
+            # QueuePool so connections stay open between loads. Each thread
+            # checks out its own connection, so they may move between threads.
+            # In-memory databases keep the dialect's default pool, since every
+            # new connection would see a different empty database
+            kwargs = dict(connect_args={'check_same_thread': False})
+            if url.database and url.database != ':memory:':
+                kwargs['poolclass'] = QueuePool
+            engine = create_engine(url, **kwargs)
+            event.listen(engine, 'connect', _set_sqlite_pragmas)
+            return engine
+            
+        kwargs = dict(
+            pool_size=5,
+            max_overflow=10,
+            pool_recycle=3600,
+            pool_pre_ping=True
+        )
+        if backend == 'postgresql' and driver == 'psycopg2':
+            kwargs['executemany_mode'] = 'values_plus_batch'
+            kwargs[_PAGE_SIZE_ARG] = 1000
+            
+        engine = create_engine(url, **kwargs)
+        
+        if backend == 'mssql' and driver == 'pyodbc':
+            event.listen(engine, 'before_cursor_execute', _enable_fast_executemany)
+            
+        return engine
+        
     def connect(self):
         """Create database connection"""
-        logger.info(f"Connecting to database: {self.db_path}")
-        self.engine = create_engine(f'sqlite:///{self.db_path}')
+        logger.info(f"Connecting to database: {self.url.render_as_string(hide_password=True)}")
+        self.engine = self._create_engine()
         self.Session = sessionmaker(bind=self.engine)
         
     def create_tables(self):
         """Create all tables if they don't exist"""
-        logger.info("Creating database tables")
+        logger.info(f"Creating database tables (schema v{SCHEMA_VERSION})")
         Base.metadata.create_all(self.engine)
+        
+        # create_all skips tables that already exist, so add any indexes
+        # introduced since those tables were created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(self.engine, checkfirst=True)
+                except exc.IntegrityError:
+                    # Older tables may already hold duplicates; loads still
+                    # work, they just can't skip repeats until those are removed
+                    logger.warning(f"Skipping unique index {index.name}: {table.name} has duplicate rows")
+        
         logger.info("Tables created successfully")
         
     def get_session(self):
@@ -0,0 +1,82 @@
+"""
+File Cache
+Caches API responses as JSON files to avoid repeated requests
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """JSON file cache with time-to-live expiry"""
+    
+    def __init__(self, cache_dir: str = '.cache', ttl: int = 86400):
+        """
+        Args:
+            cache_dir: Directory holding cached responses
+            ttl: Seconds an entry stays valid (default: 1 day)
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Build a stable cache key from keyword parts
+        
+        Example:
+            FileCache.make_key(fn='GLOBAL_QUOTE', symbol='AAPL', day='2024-01-02')
+        """
+        payload = json.dumps(parts, sort_keys=True).encode()
+        return hashlib.md5(payload).hexdigest()
+        
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+        
+    def get(self, key: str, ttl: Optional[int] = None) -> Optional[Dict]:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            ttl: Override of the cache's time-to-live for this lookup
+            
+        Returns:
+            Cached value, or None if missing, expired or unreadable
+        """
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+            
+        if time.time() - entry.get('ts', 0) > (self.ttl if ttl is None else ttl):
+            return None
+            
+        return entry.get('data')
+        
+    def set(self, key: str, value: Dict):
+        """
+        Store a value in the cache
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'ts': time.time(), 'data': value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -3,12 +3,78 @@ Crypto Data Transformer
 Cleans and structures cryptocurrency data
 """
 import logging
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from types import MappingProxyType
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Arrow-backed column types: one contiguous buffer per column instead of boxed objects
+_ARROW_DTYPES = {
+    'symbol': 'string[pyarrow]',
+    'name': 'string[pyarrow]',
+    'current_price': 'float64[pyarrow]',
+    'market_cap': 'float64[pyarrow]',
+    'total_volume': 'float64[pyarrow]',
+    'price_change_24h': 'float64[pyarrow]',
+    'timestamp': 'timestamp[us, tz=UTC][pyarrow]',
+    'extracted_at': 'timestamp[us, tz=UTC][pyarrow]'
+}
+
+# Flattened source columns for each numeric field, in priority order:
+# detailed /coins/{id} payloads, /simple/price payloads, /coins/markets rows
+_SOURCE_COLUMNS = MappingProxyType({
+    'current_price': ['market_data_current_price_usd', 'data_usd', 'current_price'],
+    'market_cap': ['market_data_market_cap_usd', 'data_usd_market_cap', 'market_cap'],
+    'total_volume': ['market_data_total_volume_usd', 'data_usd_24h_vol', 'total_volume'],
+    'price_change_24h': [
+        'market_data_price_change_percentage_24h',
+        'data_usd_24h_change',
+        'price_change_percentage_24h'
+    ]
+})
+_NUMERIC_COLS = list(_SOURCE_COLUMNS)
+
+
+def _coalesce(flat: pd.DataFrame, sources: List[str]) -> pd.Series:
+    """
+    Take the first non-null numeric value across candidate columns
+    
+    Args:
+        flat: Normalized API payloads
+        sources: Candidate column names in priority order
+        
+    Returns:
+        Float Series, NaN where no candidate has a value
+    """
+    values = pd.Series(np.nan, index=flat.index)
+    for source in sources:
+        if source in flat.columns:
+            values = values.fillna(pd.to_numeric(flat[source], errors='coerce'))
+    return values
+
+
+def _source_time(flat: pd.DataFrame) -> pd.Series:
+    """
+    Time CoinGecko last updated each coin's data
+    
+    Args:
+        flat: Normalized API payloads
+        
+    Returns:
+        UTC Series from last_updated (ISO 8601, detailed and markets
+        payloads) or data_last_updated_at (epoch seconds, simple/price),
+        NaT where neither is present
+    """
+    updated = pd.Series(pd.NaT, index=flat.index, dtype='datetime64[ns, UTC]')
+    if 'last_updated' in flat.columns:
+        updated = pd.to_datetime(flat['last_updated'], utc=True, errors='coerce', format='ISO8601')
+    if 'data_last_updated_at' in flat.columns:
+        epoch = pd.to_numeric(flat['data_last_updated_at'], errors='coerce')
+        updated = updated.fillna(pd.to_datetime(epoch, unit='s', utc=True))
+    return updated
+
 
 class CryptoTransformer:
     """Transform cryptocurrency data"""
@@ -30,53 +96,35 @@ class CryptoTransformer:
             logger.warning("No crypto data to transform")
             return pd.DataFrame()
         
-        all_crypto = []
+        # Flatten every response shape into columns in one pass
+        flat = pd.json_normalize(crypto_data, sep='_', max_level=2)
         
-        for crypto in crypto_data:
-            try:
-                # Handle both simple and detailed API responses
-                if 'market_data' in crypto:
-                    # Detailed response
-                    all_crypto.append({
-                        'symbol': crypto.get('symbol', '').upper(),
-                        'name': crypto.get('name'),
-                        'current_price': float(crypto['market_data']['current_price'].get('usd', 0)),
-                        'market_cap': float(crypto['market_data']['market_cap'].get('usd', 0)),
-                        'total_volume': float(crypto['market_data']['total_volume'].get('usd', 0)),
-                        'price_change_24h': float(crypto['market_data'].get('price_change_percentage_24h', 0)),
-                        'timestamp': datetime.now(),
-                        'extracted_at': datetime.now()
-                    })
-                else:
-                    # Simple response or markets endpoint
-                    coin_id = crypto.get('id', '')
-                    data = crypto.get('data', crypto)
-                    
-                    all_crypto.append({
-                        'symbol': crypto.get('symbol', coin_id).upper(),
-                        'name': crypto.get('name', coin_id.capitalize()),
-                        'current_price': float(data.get('usd', data.get('current_price', 0))),
-                        'market_cap': float(data.get('usd_market_cap', data.get('market_cap', 0))),
-                        'total_volume': float(data.get('usd_24h_vol', data.get('total_volume', 0))),
-                        'price_change_24h': float(data.get('usd_24h_change', data.get('price_change_percentage_24h', 0))),
-                        'timestamp': datetime.now(),
-                        'extracted_at': datetime.now()
-                    })
-            except (ValueError, KeyError, TypeError) as e:
-                logger.error(f"Error transforming crypto data: {e}")
-                continue
+        coin_ids = flat.get('id', pd.Series('', index=flat.index)).fillna('')
+        df = pd.DataFrame({
+            'symbol': flat.get('symbol', coin_ids).fillna(coin_ids).str.upper(),
+            'name': flat.get('name', coin_ids.str.capitalize()).fillna(coin_ids.str.capitalize())
+        })
+        for column, sources in _SOURCE_COLUMNS.items():
+            df[column] = _coalesce(flat, sources)
+            
+        # timestamp is when the source priced the coin, so re-running the
+        # pipeline before the next update yields the same unique key
+        now = pd.Timestamp.now(tz='UTC')
+        df = df.assign(timestamp=_source_time(flat).fillna(now), extracted_at=now)
         
-        df = pd.DataFrame(all_crypto)
+        # Data quality checks
+        valid = (df['symbol'] != '') & df['current_price'].notna()
+        if not valid.all():
+            logger.error(f"Dropping {(~valid).sum()} crypto records without a valid symbol or price")
+        df = df[valid].reset_index(drop=True)
         
         if df.empty:
             logger.warning("No crypto data after transformation")
             return df
         
-        # Data quality checks
-        df = df.dropna(subset=['symbol', 'current_price'])
-        df['current_price'] = df['current_price'].astype(float)
-        df['market_cap'] = df['market_cap'].fillna(0).astype(float)
-        df['price_change_24h'] = df['price_change_24h'].fillna(0).astype(float)
+        df[_NUMERIC_COLS] = df[_NUMERIC_COLS].fillna(0)
+        
+        df = df.astype(_ARROW_DTYPES)
         
         logger.info(f"Transformed {len(df)} crypto records")
         
@@ -3,12 +3,25 @@ Forex Data Transformer
 Cleans and structures foreign exchange data
 """
 import logging
+import numpy as np
 import pandas as pd
-from datetime import datetime
 from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Rows missing any of these are dropped
+_REQUIRED_COLS = ['base_currency', 'target_currency', 'exchange_rate']
+
+# Arrow-backed column types: one contiguous buffer per column instead of boxed objects
+_ARROW_DTYPES = {
+    'base_currency': 'string[pyarrow]',
+    'target_currency': 'string[pyarrow]',
+    'exchange_rate': 'float64[pyarrow]',
+    'rate_date': 'string[pyarrow]',
+    'timestamp': 'timestamp[us, tz=UTC][pyarrow]',
+    'extracted_at': 'timestamp[us, tz=UTC][pyarrow]'
+}
+
 
 class ForexTransformer:
     """Transform forex exchange rate data"""
@@ -34,31 +47,33 @@ class ForexTransformer:
         rates = forex_data['rates']
         rate_date = forex_data.get('date')
         
-        all_rates = []
+        # Build each column in one allocation instead of a dict per rate
+        targets = list(rates.keys())
+        try:
+            values = np.fromiter(rates.values(), dtype=np.float64, count=len(rates))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Non-numeric forex rates, dropping invalid entries: {e}")
+            values = pd.to_numeric(pd.Series(list(rates.values()), dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+            
+        df = pd.DataFrame({
+            'base_currency': base_currency,
+            'target_currency': targets,
+            'exchange_rate': values,
+            'rate_date': rate_date
+        })
         
-        for target_currency, exchange_rate in rates.items():
-            try:
-                all_rates.append({
-                    'base_currency': base_currency,
-                    'target_currency': target_currency,
-                    'exchange_rate': float(exchange_rate),
-                    'rate_date': rate_date,
-                    'timestamp': datetime.now(),
-                    'extracted_at': datetime.now()
-                })
-            except (ValueError, TypeError) as e:
-                logger.error(f"Error transforming rate for {target_currency}: {e}")
-                continue
+        # One UTC scalar broadcast to both columns
+        now = pd.Timestamp.now(tz='UTC')
+        df = df.assign(timestamp=now, extracted_at=now)
         
-        df = pd.DataFrame(all_rates)
+        # Data quality checks
+        df = df.dropna(subset=_REQUIRED_COLS)
         
         if df.empty:
             logger.warning("No forex data after transformation")
             return df
         
-        # Data quality checks
-        df = df.dropna(subset=['base_currency', 'target_currency', 'exchange_rate'])
-        df['exchange_rate'] = df['exchange_rate'].astype(float)
+        df = df.astype(_ARROW_DTYPES)
         
         logger.info(f"Transformed {len(df)} forex rate records")
         
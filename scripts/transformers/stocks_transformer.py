@@ -3,12 +3,62 @@ Stock Data Transformer
 Cleans and structures stock market data
 """
 import logging
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
+# GLOBAL_QUOTE field -> output column, in output order
+_COLMAP = MappingProxyType({
+    '05. price': 'price',
+    '02. open': 'open',
+    '03. high': 'high',
+    '04. low': 'low',
+    '06. volume': 'volume',
+    '07. latest trading day': 'latest_trading_day',
+    '08. previous close': 'previous_close'
+})
+_COLUMNS = list(_COLMAP.values())
+_NUMERIC_COLS = ['price', 'open', 'high', 'low', 'previous_close']
+_INT_COLS = ['volume']
+
+# Arrow-backed column types: one contiguous buffer per column instead of boxed objects
+_ARROW_DTYPES = {
+    'symbol': 'string[pyarrow]',
+    'price': 'float64[pyarrow]',
+    'open': 'float64[pyarrow]',
+    'high': 'float64[pyarrow]',
+    'low': 'float64[pyarrow]',
+    'volume': 'int64[pyarrow]',
+    'latest_trading_day': 'string[pyarrow]',
+    'previous_close': 'float64[pyarrow]',
+    'change': 'float64[pyarrow]',
+    'change_percent': 'float64[pyarrow]',
+    'timestamp': 'timestamp[us, tz=UTC][pyarrow]',
+    'extracted_at': 'timestamp[us, tz=UTC][pyarrow]'
+}
+
+
+def _compute_metrics(price: np.ndarray, previous_close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute absolute and percent change against the previous close
+    
+    Args:
+        price: Latest prices
+        previous_close: Previous closing prices
+        
+    Returns:
+        Tuple of (change, change_percent) arrays; both are NaN where no
+        previous close is available
+    """
+    has_close = np.isfinite(previous_close) & (previous_close != 0)
+    change = np.where(has_close, price - previous_close, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_percent = np.where(has_close, change / previous_close * 100, np.nan)
+    return change, change_percent
+
 
 class StocksTransformer:
     """Transform stock market data"""
@@ -26,44 +76,47 @@ class StocksTransformer:
         """
         logger.info("Transforming stock data")
         
-        all_stocks = []
+        if not stocks_data:
+            logger.warning("No stock data to transform")
+            return pd.DataFrame()
+        
+        # Build all columns at once from the raw quotes
+        df = pd.DataFrame.from_records([stock['data'] for stock in stocks_data])
+        df = df.rename(columns=_COLMAP).reindex(columns=_COLUMNS)
+        df.insert(0, 'symbol', [stock['symbol'] for stock in stocks_data])
         
-        for stock in stocks_data:
-            symbol = stock['symbol']
-            quote = stock['data']
-            
-            try:
-                all_stocks.append({
-                    'symbol': symbol,
-                    'price': float(quote.get('05. price', 0)),
-                    'open': float(quote.get('02. open', 0)),
-                    'high': float(quote.get('03. high', 0)),
-                    'low': float(quote.get('04. low', 0)),
-                    'volume': int(quote.get('06. volume', 0)),
-                    'latest_trading_day': quote.get('07. latest trading day'),
-                    'previous_close': float(quote.get('08. previous close', 0)),
-                    'change': float(quote.get('09. change', 0)),
-                    'change_percent': quote.get('10. change percent', '').replace('%', ''),
-                    'timestamp': datetime.now(),
-                    'extracted_at': datetime.now()
-                })
-            except (ValueError, KeyError) as e:
-                logger.error(f"Error transforming data for {symbol}: {e}")
-                continue
+        df[_NUMERIC_COLS] = df[_NUMERIC_COLS].apply(pd.to_numeric, errors='coerce')
+        df[_INT_COLS] = df[_INT_COLS].apply(pd.to_numeric, errors='coerce')
         
-        df = pd.DataFrame(all_stocks)
+        # Blank dates are unknown, not a value; the unique index treats NULLs as distinct
+        dates = df['latest_trading_day'].astype('string')
+        df['latest_trading_day'] = dates.mask(dates.str.strip() == '')
+        
+        # One UTC scalar broadcast to both columns
+        now = pd.Timestamp.now(tz='UTC')
+        df = df.assign(timestamp=now, extracted_at=now)
+        
+        # Data quality checks
+        valid = df['symbol'].notna() & df['price'].notna()
+        if not valid.all():
+            logger.error(f"Dropping {(~valid).sum()} stock records without a valid symbol or price")
+        df = df[valid].reset_index(drop=True)
         
         if df.empty:
-            logger.warning("No stock data to transform")
+            logger.warning("No stock data after transformation")
             return df
         
-        # Data quality checks
-        df = df.dropna(subset=['symbol', 'price'])
-        df['price'] = df['price'].astype(float)
-        df['volume'] = df['volume'].fillna(0).astype(int)
+        # Fields the source did not report stay missing and load as NULL
+        # Derive change metrics for all rows in one vectorized pass
+        change, change_percent = _compute_metrics(
+            df['price'].to_numpy(dtype=float),
+            df['previous_close'].to_numpy(dtype=float)
+        )
+        position = df.columns.get_loc('previous_close') + 1
+        df.insert(position, 'change', change)
+        df.insert(position + 1, 'change_percent', change_percent)
         
-        # Convert change_percent to float
-        df['change_percent'] = pd.to_numeric(df['change_percent'], errors='coerce').fillna(0)
+        df = df.astype(_ARROW_DTYPES)
         
         logger.info(f"Transformed {len(df)} stock records")
         
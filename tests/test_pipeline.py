@@ -1,7 +1,9 @@
 """
 Unit tests for financial markets pipeline
 """
+import json
 import pytest
+import requests
 from unittest.mock import Mock, patch
 import pandas as pd
 from datetime import datetime
@@ -10,7 +12,7 @@ from datetime import datetime
 class TestExtractors:
     """Test extraction scripts"""
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_crypto_extraction(self, mock_get):
         """Test crypto data extraction"""
         import sys
@@ -20,7 +22,7 @@ class TestExtractors:
         from extractors.crypto_extractor import CryptoExtractor
         
         mock_response = Mock()
-        mock_response.json.return_value = [{
+        mock_response.content = json.dumps([{
             'id': 'bitcoin',
             'symbol': 'btc',
             'name': 'Bitcoin',
@@ -28,7 +30,7 @@ class TestExtractors:
             'market_cap': 850000000000,
             'total_volume': 25000000000,
             'price_change_percentage_24h': 2.5
-        }]
+        }]).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
         
@@ -38,6 +40,249 @@ class TestExtractors:
         assert result is not None
         assert len(result) == 1
         assert result[0]['id'] == 'bitcoin'
+    
+    @patch('requests.Session.get')
+    def test_crypto_response_cache(self, mock_get):
+        """Test warm calls are served from cache and failures fall back to last good data"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors import crypto_extractor
+        from extractors.crypto_extractor import CryptoExtractor
+        
+        mock_response = Mock()
+        mock_response.content = json.dumps({'ethereum': {'usd': 2300}}).encode()
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        extractor = CryptoExtractor()
+        first = extractor.extract_crypto_prices(['ethereum'])
+        second = extractor.extract_crypto_prices(['ethereum'])
+        
+        assert mock_get.call_count == 1
+        assert first == second == [{'id': 'ethereum', 'data': {'usd': 2300}}]
+        
+        # Expired entry plus a failing refresh serves the last good response
+        crypto_extractor._response_cache.clear()
+        mock_get.side_effect = requests.exceptions.HTTPError("429 Too Many Requests")
+        
+        assert extractor.extract_crypto_prices(['ethereum']) == first
+
+    @patch('requests.Session.get')
+    def test_stocks_bulk_quotes(self, mock_get):
+        """Test bulk quotes are reshaped like GLOBAL_QUOTE responses"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.stocks_extractor import StocksExtractor
+        
+        mock_response = Mock()
+        mock_response.content = json.dumps({
+            'endpoint': 'Realtime Bulk Quotes',
+            'data': [{
+                'symbol': 'AAPL',
+                'timestamp': '2024-01-02 16:00:00',
+                'open': '187.15',
+                'high': '188.44',
+                'low': '183.89',
+                'close': '185.64',
+                'volume': '82488700',
+                'previous_close': '192.53',
+                'change': '-6.89',
+                'change_percent': '-3.5787'
+            }]
+        }).encode()
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        extractor = StocksExtractor('demo')
+        result = extractor.extract_bulk_quotes(['AAPL'])
+        
+        assert mock_get.call_count == 1
+        assert result[0]['symbol'] == 'AAPL'
+        assert result[0]['data']['05. price'] == '185.64'
+        assert result[0]['data']['07. latest trading day'] == '2024-01-02'
+    
+    def test_stocks_concurrent_extraction(self):
+        """Test per-symbol quotes are fetched concurrently and 429s honor Retry-After"""
+        import sys
+        import os
+        import httpx
+        from unittest.mock import AsyncMock
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.stocks_extractor import StocksExtractor
+        
+        request = httpx.Request('GET', 'https://www.alphavantage.co/query')
+        
+        def quote_response(symbol):
+            body = {'Global Quote': {'01. symbol': symbol, '05. price': '100.00'}}
+            return httpx.Response(200, content=json.dumps(body).encode(), request=request)
+        
+        responses = [
+            quote_response('AAPL'),
+            httpx.Response(429, headers={'Retry-After': '7'}, request=request),
+            quote_response('MSFT'),
+        ]
+        
+        # Batch endpoint not available for this key
+        batch_response = Mock()
+        batch_response.content = json.dumps({'Information': 'premium endpoint'}).encode()
+        batch_response.raise_for_status = Mock()
+        
+        with patch('requests.Session.get', return_value=batch_response), \
+                patch('httpx.AsyncClient.get', new_callable=AsyncMock, side_effect=responses) as mock_get, \
+                patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            extractor = StocksExtractor('demo')
+            result = extractor.extract_multiple_stocks(['AAPL', 'MSFT'], delay=0.01)
+        
+        assert mock_get.call_count == 3
+        assert mock_sleep.await_count == 1
+        assert mock_sleep.await_args.args[0] == pytest.approx(7, abs=1)
+        assert sorted(stock['symbol'] for stock in result) == ['AAPL', 'MSFT']
+    
+    @patch('requests.Session.get')
+    def test_stocks_batch_quotes(self, mock_get):
+        """Test symbols are packed into BATCH_STOCK_QUOTES requests"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.stocks_extractor import StocksExtractor
+        
+        symbols = [f"SYM{i}" for i in range(25)]
+        
+        def batch_response(url, params=None, timeout=None):
+            response = Mock()
+            if params['function'] == 'BATCH_STOCK_QUOTES':
+                body = {'Stock Quotes': [
+                    {'1. symbol': symbol, '2. price': '10.00', '3. volume': '100',
+                     '4. timestamp': '2024-01-02 16:00:00'}
+                    for symbol in params['symbols'].split(',')
+                ]}
+            else:
+                body = {'Information': 'premium endpoint'}
+            response.content = json.dumps(body).encode()
+            response.raise_for_status = Mock()
+            return response
+        
+        mock_get.side_effect = batch_response
+        
+        extractor = StocksExtractor('demo')
+        result = extractor.extract_multiple_stocks(symbols)
+        
+        # One refused bulk probe, then two batch requests
+        assert mock_get.call_count == 3
+        assert [stock['symbol'] for stock in result] == symbols
+        assert result[0]['data']['07. latest trading day'] == '2024-01-02'
+        
+        # The refused endpoint is not probed again
+        extractor.extract_multiple_stocks(symbols[:5])
+        assert mock_get.call_count == 4
+        
+        # Fields the batch endpoint does not report are left missing
+        from transformers.stocks_transformer import StocksTransformer
+        df = StocksTransformer.transform(result)
+        assert df['open'].isna().all()
+        assert df['change'].isna().all()
+        assert (df['price'] == 10.0).all()
+
+    @patch('requests.Session.get')
+    def test_stocks_throttling_not_refusal(self, mock_get):
+        """Test throttling replies keep endpoints enabled and partial batches are kept"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.stocks_extractor import StocksExtractor
+        
+        symbols = [f"SYM{i}" for i in range(25)]
+        ok = Mock()
+        ok.content = json.dumps({'Stock Quotes': [
+            {'1. symbol': symbol, '2. price': '10.00', '3. volume': '100', '4. timestamp': '2024-01-02 16:00:00'}
+            for symbol in symbols[:20]
+        ]}).encode()
+        throttled = Mock()
+        throttled.content = json.dumps({'Note': 'Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute.'}).encode()
+        limited = Mock()
+        limited.content = json.dumps({'Information': 'Our standard API rate limit is 25 requests per day. '
+                                                     'Please subscribe to any of the premium plans.'}).encode()
+        for response in (ok, throttled, limited):
+            response.raise_for_status = Mock()
+        mock_get.side_effect = [ok, throttled, limited]
+        
+        extractor = StocksExtractor('demo')
+        
+        # The second chunk is throttled; the first chunk's quotes survive
+        result = extractor.extract_stocks_batch(symbols)
+        assert [stock['symbol'] for stock in result] == symbols[:20]
+        assert extractor.extract_bulk_quotes(symbols) is None
+        
+        assert not extractor._is_unavailable('BATCH_STOCK_QUOTES')
+        assert not extractor._is_unavailable('REALTIME_BULK_QUOTES')
+
+    def test_stocks_cache_checked_before_requests(self):
+        """Test warm cache runs make no requests and endpoint refusals persist"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.stocks_extractor import StocksExtractor
+        from tools.cache import FileCache
+        
+        refused = Mock()
+        refused.content = json.dumps({'Information': 'premium endpoint'}).encode()
+        refused.raise_for_status = Mock()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch('requests.Session.get', return_value=refused) as mock_get, \
+                patch('httpx.AsyncClient.get') as mock_async_get:
+            cache = FileCache(tmp_dir, ttl=60)
+            extractor = StocksExtractor('demo', cache=cache)
+            for symbol in ['AAPL', 'MSFT']:
+                extractor._store_quote(symbol, {'symbol': symbol, 'data': {'05. price': '100.00'}})
+                
+            result = extractor.extract_multiple_stocks(['AAPL', 'MSFT'])
+            
+            assert [stock['symbol'] for stock in result] == ['AAPL', 'MSFT']
+            assert mock_get.call_count == 0
+            assert mock_async_get.call_count == 0
+            
+            # Partial batch quotes are never served as complete quotes
+            extractor._store_quote('IBM', {'symbol': 'IBM', 'data': {'05. price': '1.00'}}, 'BATCH_STOCK_QUOTES')
+            assert extractor._cached_quote('IBM') is None
+            
+            # A refusal recorded by one run is honoured by the next
+            extractor._mark_unavailable('REALTIME_BULK_QUOTES')
+            extractor._mark_unavailable('BATCH_STOCK_QUOTES')
+            assert StocksExtractor('demo', cache=cache)._is_unavailable('BATCH_STOCK_QUOTES')
+    
+    @patch('requests.Session.get')
+    def test_forex_rates_filtered(self, mock_get):
+        """Test only requested currencies are kept"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from extractors.forex_extractor import ForexExtractor
+        
+        mock_response = Mock()
+        mock_response.content = json.dumps({
+            'base': 'USD',
+            'date': '2024-01-02',
+            'rates': {'USD': 1, 'EUR': 0.91, 'GBP': 0.79, 'JPY': 141.8}
+        }).encode()
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        extractor = ForexExtractor()
+        result = extractor.extract_exchange_rates('USD', ['GBP', 'EUR', 'XXX'])
+        
+        assert result['date'] == '2024-01-02'
+        assert result['rates'] == {'GBP': 0.79, 'EUR': 0.91}
 
 
 class TestTransformers:
@@ -68,6 +313,94 @@ class TestTransformers:
         assert len(df) == 1
         assert 'symbol' in df.columns
         assert df.iloc[0]['current_price'] == 45000
+    
+    def test_crypto_transformation_response_shapes(self):
+        """Test simple price payloads and null fields are normalized"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from transformers.crypto_transformer import CryptoTransformer
+        
+        raw_data = [
+            {'id': 'ethereum', 'data': {'usd': 2300, 'usd_market_cap': 2.8e11}},
+            {'id': 'solana', 'symbol': 'sol', 'name': 'Solana', 'current_price': 98.5,
+             'market_cap': 4.2e10, 'total_volume': 1.9e9, 'price_change_percentage_24h': None},
+            {'id': 'unknown', 'symbol': 'unk', 'name': 'Unknown', 'current_price': None}
+        ]
+        
+        df = CryptoTransformer.transform(raw_data)
+        
+        assert list(df['symbol']) == ['ETHEREUM', 'SOL']
+        assert df.iloc[0]['name'] == 'Ethereum'
+        assert df.iloc[0]['market_cap'] == pytest.approx(2.8e11)
+        assert df.iloc[0]['total_volume'] == 0
+        assert df.iloc[1]['price_change_24h'] == 0
+    
+    def test_crypto_timestamp_from_source(self):
+        """Test crypto rows are keyed on CoinGecko's update time, not the run time"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from loaders.data_loader import DataLoader
+        from transformers.crypto_transformer import CryptoTransformer
+        
+        raw_data = [
+            {'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin', 'current_price': 45000,
+             'last_updated': '2024-01-02T12:00:00.123Z'},
+            {'id': 'ethereum', 'data': {'usd': 2300, 'last_updated_at': 1704196800}}
+        ]
+        
+        first = CryptoTransformer.transform(raw_data)
+        second = CryptoTransformer.transform(raw_data)
+        
+        assert first.iloc[0]['timestamp'] == pd.Timestamp('2024-01-02 12:00:00.123', tz='UTC')
+        assert first.iloc[1]['timestamp'] == pd.Timestamp('2024-01-02 12:00:00', tz='UTC')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with DataLoader(os.path.join(tmp_dir, 'markets.db')) as loader:
+                assert loader.load_crypto(first) == 2
+                assert loader.load_crypto(second) == 0
+    
+    def test_stocks_transformation(self):
+        """Test stock data transformation and change metrics"""
+        import sys
+        import os
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from transformers.stocks_transformer import StocksTransformer
+        
+        raw_data = [{
+            'symbol': 'IBM',
+            'data': {
+                '01. symbol': 'IBM',
+                '02. open': '160.00',
+                '03. high': '162.50',
+                '04. low': '159.00',
+                '05. price': '161.00',
+                '06. volume': '3500000',
+                '07. latest trading day': '2024-01-02',
+                '08. previous close': '160.00',
+                '09. change': '1.0000',
+                '10. change percent': '0.6250%'
+            }
+        }]
+        
+        transformer = StocksTransformer()
+        df = transformer.transform(raw_data)
+        
+        assert len(df) == 1
+        assert list(df.columns[8:10]) == ['change', 'change_percent']
+        assert df.iloc[0]['volume'] == 3500000
+        assert str(df['volume'].dtype) == 'int64[pyarrow]'
+        assert str(df['timestamp'].dtype) == 'timestamp[us, tz=UTC][pyarrow]'
+        assert df.iloc[0]['change'] == pytest.approx(1.0)
+        assert df.iloc[0]['change_percent'] == pytest.approx(0.625)
+        
+        undated = transformer.transform([{'symbol': 'IBM', 'data': {'05. price': '161.00', '07. latest trading day': ''}}])
+        assert undated['latest_trading_day'].isna().all()
 
 
 class TestLoaders:
@@ -98,6 +431,167 @@ class TestLoaders:
             assert 'crypto' in tables
             assert 'forex' in tables
             
+            forex_indexes = {index['name'] for index in inspector.get_indexes('forex')}
+            assert forex_indexes == {'ix_forex_pair', 'ix_forex_date', 'uq_forex_pair_day'}
+            
         finally:
             if os.path.exists(db_path):
                 os.remove(db_path)
+    
+    def test_load_and_count_records(self):
+        """Test loaded rows are visible in the record counts"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from loaders.data_loader import DataLoader
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            loader = DataLoader(os.path.join(tmp_dir, 'markets.db'))
+            
+            forex_df = pd.DataFrame([{
+                'base_currency': 'USD',
+                'target_currency': target,
+                'exchange_rate': rate,
+                'rate_date': '2024-01-02',
+                'timestamp': datetime(2024, 1, 2, 12, 0),
+                'extracted_at': datetime(2024, 1, 2, 12, 0)
+            } for target, rate in [('EUR', 0.91), ('GBP', 0.79)]])
+            
+            assert loader.load_forex(forex_df) == 2
+            assert loader.load_stocks(pd.DataFrame()) == 0
+            
+            # Re-running the same load skips rows already stored
+            assert loader.load_forex(forex_df) == 0
+            assert loader.load_forex(forex_df, method='multi') == 0
+            assert loader.get_record_counts() == {'stocks': 0, 'crypto': 0, 'forex': 2}
+            
+            loader.close()
+            
+            # A replaced database file is picked up by the next loader
+            os.remove(os.path.join(tmp_dir, 'markets.db'))
+            other = DataLoader(os.path.join(tmp_dir, 'markets.db'))
+            assert other.load_forex(forex_df) == 2
+            assert os.path.exists(os.path.join(tmp_dir, 'markets.db'))
+            other.close()
+            
+            loader.db_manager.engine.dispose()
+    
+    def test_stocks_reload_updates_quote(self):
+        """Test a later run for the same trading day refreshes the stored quote"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from sqlalchemy import text
+        from loaders.data_loader import DataLoader
+        
+        def quote(price, open_price):
+            return pd.DataFrame([{
+                'symbol': 'AAPL',
+                'price': price,
+                'open': open_price,
+                'volume': 100,
+                'latest_trading_day': '2024-01-02',
+                'timestamp': datetime(2024, 1, 2, 12, 0),
+                'extracted_at': datetime(2024, 1, 2, 12, 0)
+            }])
+            
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            loader = DataLoader(os.path.join(tmp_dir, 'markets.db'))
+            
+            assert loader.load_stocks(quote(185.0, 187.0)) == 1
+            assert loader.load_stocks(quote(186.5, None)) == 1
+            assert loader.load_stocks(quote(188.0, None), method='multi') == 1
+            
+            with loader.db_manager.engine.connect() as conn:
+                rows = conn.execute(text("SELECT price, open FROM stocks")).all()
+                
+            # Missing fields in the later quote keep the stored values
+            assert [tuple(row) for row in rows] == [(188.0, 187.0)]
+            
+            loader.close()
+    
+    def test_load_all_concurrently(self):
+        """Test all three tables are loaded from transformed data in parallel"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from loaders.data_loader import DataLoader
+        from transformers.crypto_transformer import CryptoTransformer
+        from transformers.forex_transformer import ForexTransformer
+        from transformers.stocks_transformer import StocksTransformer
+        
+        stocks_df = StocksTransformer.transform([
+            {'symbol': 'IBM', 'data': {'05. price': '161.00', '07. latest trading day': '2024-01-02'}}
+        ])
+        crypto_df = CryptoTransformer.transform([{'id': 'bitcoin', 'data': {'usd': 45000}}])
+        forex_df = ForexTransformer.transform({'base': 'USD', 'date': '2024-01-02', 'rates': {'EUR': 0.91, 'GBP': 0.79}})
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            loader = DataLoader(os.path.join(tmp_dir, 'markets.db'))
+            
+            assert loader.load_all(stocks_df, crypto_df, forex_df) == {'stocks': 1, 'crypto': 1, 'forex': 2}
+            assert loader.get_record_counts() == {'stocks': 1, 'crypto': 1, 'forex': 2}
+            
+            loader.db_manager.engine.dispose()
+    
+    def test_load_many_coalesces_fragments(self):
+        """Test small DataFrames are buffered into batched inserts"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from loaders.data_loader import DataLoader
+        
+        fragments = [pd.DataFrame([{
+            'base_currency': 'USD',
+            'target_currency': target,
+            'exchange_rate': 1.0,
+            'rate_date': '2024-01-02',
+            'timestamp': datetime(2024, 1, 2, 12, 0),
+            'extracted_at': datetime(2024, 1, 2, 12, 0)
+        }]) for target in ['EUR', 'GBP', 'JPY', 'CHF', 'CAD']]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with DataLoader(os.path.join(tmp_dir, 'markets.db')) as loader:
+                with patch.object(loader, '_bulk_to_sql', wraps=loader._bulk_to_sql) as bulk:
+                    assert loader.load_many('forex', iter(fragments), batch_rows=2) == 5
+                    
+                assert bulk.call_count == 3
+                assert loader.get_record_counts()['forex'] == 5
+                
+                with pytest.raises(ValueError):
+                    loader.load_many('unknown', fragments)
+                    
+            loader.db_manager.engine.dispose()
+
+
+class TestTools:
+    """Test shared tools"""
+    
+    def test_file_cache(self):
+        """Test file cache round trip and expiry"""
+        import sys
+        import os
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        
+        from tools.cache import FileCache
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = FileCache(tmp_dir, ttl=60)
+            key = FileCache.make_key(fn='GLOBAL_QUOTE', symbol='IBM', day='2024-01-02')
+            
+            assert cache.get(key) is None
+            cache.set(key, {'symbol': 'IBM', 'data': {'05. price': '161.00'}})
+            assert cache.get(key) == {'symbol': 'IBM', 'data': {'05. price': '161.00'}}
+            
+            expired = FileCache(tmp_dir, ttl=-1)
+            assert expired.get(key) is None
+            assert expired.get(key, ttl=60) == {'symbol': 'IBM', 'data': {'05. price': '161.00'}}